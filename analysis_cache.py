@@ -0,0 +1,123 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Optional
+
+from storage import cache_path, connect
+
+DEFAULT_CACHE_PATH = cache_path('analysis.sqlite3')
+
+
+def make_cache_key(resume_data: Dict[str, str], model: str, prompt_version: str, extra: Dict = None) -> str:
+    """Build a content-addressed key from the parsed sections, model and prompt version"""
+    payload = {
+        "sections": {k: v for k, v in sorted(resume_data.items()) if k != "full_text"},
+        "model": model,
+        "prompt_version": prompt_version,
+        "extra": extra or {}
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class AnalysisCache:
+    """SQLite-backed cache for AI analyses with TTL and LRU eviction"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: Optional[float] = 7 * 24 * 3600,
+                 max_entries: int = 10000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Streamlit reruns the script on different threads, so share one connection under a lock
+        self._conn = connect(path)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS analyses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_accessed ON analyses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached analysis for key, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM analyses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM analyses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE analyses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(value)
+
+    def contains(self, key: str) -> bool:
+        """Whether key is stored, without touching its recency or the hit/miss counters"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM analyses WHERE key = ?", (key,)).fetchone() is not None
+
+    def set(self, key: str, analysis: Dict) -> None:
+        """Store an analysis and evict least recently used entries above max_entries"""
+        now = time.time()
+        value = json.dumps(analysis, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the least recently used ones over capacity"""
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM analyses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+
+        count = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM analyses WHERE key IN (SELECT key FROM analyses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def clear(self) -> None:
+        """Remove every cached analysis and reset the counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM analyses")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the current number of entries"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": size
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,7 +1,12 @@
 import streamlit as st
-from pdf_parser import extract_resume_data
-from resume_analyzer import ResumeAnalyzer
+from job_matching import JOB_MATCH_POINTS
+from job_queue import JobQueue, DEFAULT_QUEUE_PATH, QUEUED, RUNNING, FAILED
+from analysis_cache import AnalysisCache, DEFAULT_CACHE_PATH
+from metrics import metrics
+from pdf_parser import MAX_BYTES
 import os
+import subprocess
+import sys
 
 # Page configuration
 st.set_page_config(
@@ -28,10 +33,24 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Initialize analyzer
+# Analyses run in worker processes fed by a local job queue
 @st.cache_resource
-def get_analyzer():
-    return ResumeAnalyzer()
+def get_job_queue():
+    return JobQueue(os.getenv("JOB_QUEUE_PATH", DEFAULT_QUEUE_PATH))
+
+@st.cache_resource
+def start_workers():
+    # JOB_WORKERS=0 means workers are run separately with `python job_queue.py`
+    workers = int(os.getenv("JOB_WORKERS", "2"))
+    if workers <= 0:
+        return None
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_queue.py")
+    return subprocess.Popen([sys.executable, script, "--workers", str(workers), "--queue", get_job_queue().path,
+                             "--parent-pid", str(os.getpid())])
+
+@st.cache_resource
+def get_cache():
+    return AnalysisCache(os.getenv("ANALYSIS_CACHE_PATH", DEFAULT_CACHE_PATH))
 
 def display_ats_score(score, breakdown):
     """Display ATS score with visual representation"""
@@ -66,13 +85,188 @@ def display_ats_score(score, breakdown):
                 "experience": 30,
                 "education": 20,
                 "skills": 15,
-                "formatting": 5
+                "formatting": 5,
+                "job_match": JOB_MATCH_POINTS
             }.get(category, 10)
 
             percentage = (points / max_points * 100) if max_points > 0 else 0
             st.write(f"**{category.replace('_', ' ').title()}**: {points}/{max_points}")
             st.progress(percentage / 100)
 
+def create_result_slots():
+    """Lay out the result sections up front so they can be filled in while the analysis streams"""
+    slots = {}
+    st.markdown("---")
+
+    # ATS Score Section
+    st.header("ATS Score")
+    slots["score"] = st.empty()
+
+    st.markdown("---")
+
+    # AI Analysis Section
+    st.header("Detailed Analysis")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("Strengths")
+        slots["strengths"] = st.empty()
+        st.subheader("Keywords Found")
+        slots["keywords_found"] = st.empty()
+
+    with col2:
+        st.subheader("Areas for Improvement")
+        slots["weaknesses"] = st.empty()
+        st.subheader("Missing Keywords")
+        slots["keywords_missing"] = st.empty()
+
+    st.markdown("---")
+
+    # Missing Sections
+    slots["missing_sections"] = st.empty()
+
+    # Recommendations
+    st.markdown("---")
+    st.header("Recommendations")
+    st.subheader("AI-Powered Suggestions")
+    slots["recommendations"] = st.empty()
+    st.subheader("Additional Improvement Tips")
+    slots["suggestions"] = st.empty()
+
+    # Overall Impression
+    slots["overall_impression"] = st.empty()
+
+    for name in ("score", "strengths", "keywords_found", "weaknesses", "keywords_missing", "recommendations"):
+        slots[name].caption("Waiting for analysis...")
+    return slots
+
+def render_analysis(slots, ai_analysis, rule_based_score, rule_based_breakdown):
+    """Render every field of the (possibly partial) AI analysis that has arrived"""
+    if "ats_score" in ai_analysis:
+        with slots["score"].container():
+            display_ats_score(ai_analysis["ats_score"], ai_analysis.get("score_breakdown", rule_based_breakdown))
+            variance = ai_analysis.get("score_variance")
+            if variance:
+                st.caption(f"Median of {variance['samples']} samples; the score varied by "
+                           f"±{variance['ats_score'] ** 0.5:.1f} points between them")
+
+    if "strengths" in ai_analysis:
+        with slots["strengths"].container():
+            if ai_analysis["strengths"]:
+                for strength in ai_analysis["strengths"]:
+                    st.success(f"✓ {strength}")
+            else:
+                st.info("No specific strengths identified")
+
+    if "keywords_found" in ai_analysis:
+        with slots["keywords_found"].container():
+            if ai_analysis["keywords_found"]:
+                st.write(", ".join(ai_analysis["keywords_found"]))
+            else:
+                st.info("No specific keywords analyzed")
+
+    if "weaknesses" in ai_analysis:
+        with slots["weaknesses"].container():
+            if ai_analysis["weaknesses"]:
+                for weakness in ai_analysis["weaknesses"]:
+                    st.warning(f"⚠ {weakness}")
+            else:
+                st.info("No specific weaknesses identified")
+
+    if "keywords_missing" in ai_analysis:
+        with slots["keywords_missing"].container():
+            if ai_analysis["keywords_missing"]:
+                st.write(", ".join(ai_analysis["keywords_missing"]))
+            else:
+                st.info("No missing keywords identified")
+
+    if ai_analysis.get("missing_sections"):
+        with slots["missing_sections"].container():
+            st.subheader("Missing or Incomplete Sections")
+            for section in ai_analysis["missing_sections"]:
+                st.error(f"❌ {section}")
+
+    if "recommendations" in ai_analysis:
+        with slots["recommendations"].container():
+            for i, rec in enumerate(ai_analysis["recommendations"], 1):
+                st.markdown(f"**{i}.** {rec}")
+
+    if ai_analysis.get("overall_impression"):
+        with slots["overall_impression"].container():
+            st.markdown("---")
+            st.header("Overall Impression")
+            st.info(ai_analysis["overall_impression"])
+
+def show_job(job_id):
+    """Show a queued job's progress, or its result once a worker has finished it"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        st.warning("This analysis is no longer available. Please upload the resume again.")
+        del st.query_params["job"]
+        return
+
+    if st.button("Start a new analysis"):
+        del st.query_params["job"]
+        st.session_state["upload_round"] = st.session_state.get("upload_round", 0) + 1
+        st.rerun()
+
+    if job["status"] in (QUEUED, RUNNING):
+        poll_job(job_id)
+    elif job["status"] == FAILED:
+        st.error(f"Error analyzing resume: {job['error']}")
+        st.error("Please make sure the PDF is readable and try again.")
+        if st.button("Retry"):
+            get_job_queue().retry(job_id)
+            st.rerun()
+    else:
+        render_result(job["result"])
+
+@st.fragment(run_every=1.0)
+def poll_job(job_id):
+    """Re-render just this fragment every second while the job is queued or running"""
+    job = get_job_queue().get(job_id)
+    if job is None or job["status"] not in (QUEUED, RUNNING):
+        # Finished: rerun the whole page once to show the final result
+        st.rerun()
+        return
+
+    if job["status"] == QUEUED:
+        st.info(f"Waiting for a worker ({job['queue_position']} ahead in the queue)...")
+    else:
+        st.info({
+            "extracting": "Extracting text from PDF...",
+            "scoring": "Calculating initial ATS score...",
+            "analyzing": "Getting AI-powered analysis and ATS score..."
+        }.get(job["stage"], "Analyzing your resume..."))
+
+    slots = create_result_slots()
+    if job["partial"]:
+        # Fields streamed so far by the worker
+        render_analysis(slots, job["partial"], None, {})
+
+def render_result(result):
+    """Render a finished job"""
+    rule_based_score = result["rule_based_score"]
+    rule_based_breakdown = result["rule_based_breakdown"]
+    ai_analysis = result["analysis"]
+
+    slots = create_result_slots()
+    render_analysis(slots, ai_analysis, rule_based_score, rule_based_breakdown)
+    with slots["suggestions"].container():
+        for i, suggestion in enumerate(result["suggestions"], 1):
+            st.markdown(f"**{i}.** {suggestion}")
+
+    st.success("Analysis complete!")
+
+    # Resume Sections Preview
+    with st.expander("View Extracted Resume Sections"):
+        for section, content in result["sections"].items():
+            if content:
+                st.subheader(section.replace("_", " ").title())
+                # Workers already cut each section to a short preview
+                st.text(content)
+
 def main():
     st.title("📄 AI Resume Analyzer")
     st.markdown("### Upload your resume to get detailed ATS analysis and improvement suggestions")
@@ -98,115 +292,60 @@ def main():
         5. Implement suggestions
         """)
 
-    # File uploader
-    uploaded_file = st.file_uploader("Choose your resume (PDF)", type=['pdf'])
-
-    if uploaded_file is not None:
-        with st.spinner("Analyzing your resume..."):
-            try:
-                # Extract resume data
-                st.info("Extracting text from PDF...")
-                resume_data = extract_resume_data(uploaded_file)
-
-                # Initialize analyzer
-                analyzer = get_analyzer()
-
-                # Calculate rule-based ATS score (for reference)
-                st.info("Calculating initial ATS score...")
-                rule_based_score, rule_based_breakdown = analyzer.calculate_ats_score(resume_data)
-
-                # Get AI analysis with ATS score (AI will decide the final score)
-                st.info("Getting AI-powered analysis and ATS score...")
-                ai_analysis = analyzer.analyze_resume_with_ai(resume_data, rule_based_score, rule_based_breakdown)
-
-                # Extract AI-determined ATS score and breakdown
-                ats_score = ai_analysis.get("ats_score", rule_based_score)
-                score_breakdown = ai_analysis.get("score_breakdown", rule_based_breakdown)
-
-                # Get improvement suggestions
-                suggestions = analyzer.get_improvement_suggestions(resume_data, ats_score)
-
-                st.success("Analysis complete!")
-
-                # Display results
-                st.markdown("---")
-
-                # ATS Score Section
-                st.header("ATS Score")
-                display_ats_score(ats_score, score_breakdown)
-
-                st.markdown("---")
-
-                # AI Analysis Section
-                st.header("Detailed Analysis")
-
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    st.subheader("Strengths")
-                    if ai_analysis.get("strengths"):
-                        for strength in ai_analysis["strengths"]:
-                            st.success(f"✓ {strength}")
-                    else:
-                        st.info("No specific strengths identified")
-
-                    st.subheader("Keywords Found")
-                    if ai_analysis.get("keywords_found"):
-                        st.write(", ".join(ai_analysis["keywords_found"]))
-                    else:
-                        st.info("No specific keywords analyzed")
-
-                with col2:
-                    st.subheader("Areas for Improvement")
-                    if ai_analysis.get("weaknesses"):
-                        for weakness in ai_analysis["weaknesses"]:
-                            st.warning(f"⚠ {weakness}")
-                    else:
-                        st.info("No specific weaknesses identified")
-
-                    st.subheader("Missing Keywords")
-                    if ai_analysis.get("keywords_missing"):
-                        st.write(", ".join(ai_analysis["keywords_missing"]))
-                    else:
-                        st.info("No missing keywords identified")
-
-                st.markdown("---")
-
-                # Missing Sections
-                if ai_analysis.get("missing_sections"):
-                    st.subheader("Missing or Incomplete Sections")
-                    for section in ai_analysis["missing_sections"]:
-                        st.error(f"❌ {section}")
-
-                # Recommendations
-                st.markdown("---")
-                st.header("Recommendations")
-                st.subheader("AI-Powered Suggestions")
-                if ai_analysis.get("recommendations"):
-                    for i, rec in enumerate(ai_analysis["recommendations"], 1):
-                        st.markdown(f"**{i}.** {rec}")
-
-                st.subheader("Additional Improvement Tips")
-                for i, suggestion in enumerate(suggestions, 1):
-                    st.markdown(f"**{i}.** {suggestion}")
-
-                # Overall Impression
-                if ai_analysis.get("overall_impression"):
-                    st.markdown("---")
-                    st.header("Overall Impression")
-                    st.info(ai_analysis["overall_impression"])
-
-                # Resume Sections Preview
-                with st.expander("View Extracted Resume Sections"):
-                    for section, content in resume_data.items():
-                        if section != "full_text" and content:
-                            st.subheader(section.replace("_", " ").title())
-                            st.text(content[:500] + ("..." if len(content) > 500 else ""))
-
-            except Exception as e:
-                st.error(f"Error analyzing resume: {str(e)}")
-                st.error("Please make sure the PDF is readable and try again.")
+        st.header("Analysis mode")
+        mode = st.radio(
+            "Analysis mode",
+            ["AI (Groq)", "Fast (local)"],
+            label_visibility="collapsed",
+            help="Fast mode scores and reviews the resume locally in milliseconds, without an LLM call"
+        )
+
+        st.header("Job description")
+        job_description = st.text_area(
+            "Paste a job description to match against (optional)",
+            height=200
+        )
+
+        counts = get_job_queue().counts()
+        st.caption(f"Jobs: {counts[QUEUED]} queued, {counts[RUNNING]} running; "
+                   f"analysis cache: {get_cache().stats()['entries']} entries")
+
+        with st.expander("Debug: pipeline metrics"):
+            # Extraction and analysis run in the queue workers; show their metrics merged with the app's
+            combined = get_job_queue().combined_metrics(metrics)
+            snapshot = combined.snapshot()
+            if snapshot["stages"]:
+                st.dataframe(
+                    [{"stage": stage, **stats} for stage, stats in snapshot["stages"].items()],
+                    hide_index=True
+                )
+            st.json(snapshot["counters"])
+            st.download_button("Prometheus metrics", combined.to_prometheus(), file_name="metrics.prom")
 
+    # File uploader
+    # A new key empties the uploader when the user starts over
+    uploaded_file = st.file_uploader("Choose your resume (PDF)", type=['pdf'],
+                                     key=f"upload_{st.session_state.get('upload_round', 0)}")
+    start_workers()
+
+    if uploaded_file is not None and MAX_BYTES and uploaded_file.size > MAX_BYTES:
+        st.error(f"This PDF is {uploaded_file.size / 1024 / 1024:.1f} MB; the limit is {MAX_BYTES / 1024 / 1024:.0f} MB.")
+    elif uploaded_file is not None:
+        # Identical uploads with identical options map to the same job, so reruns do not enqueue twice
+        params = {
+            "mode": "fast" if mode == "Fast (local)" else "ai",
+            "job_description": job_description.strip(),
+            "filename": uploaded_file.name
+        }
+        # The upload is copied to disk in chunks for the workers rather than held in memory or the queue
+        queue = get_job_queue()
+        upload = queue.save_upload(uploaded_file)
+        # The job id in the URL lets a refreshed or reconnected page pick the result back up
+        st.query_params["job"] = queue.enqueue(upload, params)
+
+    job_id = st.query_params.get("job")
+    if job_id:
+        show_job(job_id)
     else:
         # Display sample information
         st.info("Please upload a PDF resume to begin analysis")
@@ -0,0 +1,278 @@
+"""Batch resume analysis from the command line.
+
+Example:
+    python batch.py resumes/ "applicants/*.pdf" -o results.jsonl --workers 8 --max-in-flight 4
+    python batch.py resumes/ -o triage.jsonl --mode fast
+    python batch.py --from-store -o rescored.jsonl --mode rules --no-resume
+    python batch.py --from-store --job-description jd.txt --rank 50 > shortlist.jsonl
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Set, Tuple
+
+from pdf_parser import extract_resume_data
+from resume_analyzer import ResumeAnalyzer
+from job_matching import JobDescriptionIndex
+from metrics import metrics
+from resume_store import DEFAULT_STORE_PATH, ResumeStore, load_resume_data
+
+
+def collect_pdfs(inputs: Iterable[str]) -> List[str]:
+    """Expand directories and glob patterns into a sorted, de-duplicated list of PDF paths"""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, "**", "*.pdf"), recursive=True)
+            matches += glob.glob(os.path.join(item, "**", "*.PDF"), recursive=True)
+        else:
+            matches = glob.glob(item, recursive=True)
+        paths.update(os.path.abspath(m) for m in matches if m.lower().endswith(".pdf") and os.path.isfile(m))
+    return sorted(paths)
+
+
+def load_completed(output_path: str) -> Set[str]:
+    """Return files already written to a previous (possibly interrupted) output file"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line
+                continue
+            if "error" not in record:
+                done.add(record.get("file"))
+    return done
+
+
+def analyze_file(path: str, analyzer: ResumeAnalyzer, llm_slots: threading.Semaphore, mode: str = "ai",
+                 job_index: JobDescriptionIndex = None, store: ResumeStore = None,
+                 resume_data: Dict = None) -> Dict:
+    """Run extraction, rule-based scoring and AI analysis for a single PDF.
+
+    resume_data skips extraction entirely (used when rescoring the store); with a
+    store, PDFs already parsed by the current parser are not opened again.
+    """
+    start = time.perf_counter()
+    try:
+        if resume_data is None:
+            if store is not None:
+                _, resume_data = load_resume_data(path, store)
+            else:
+                resume_data = extract_resume_data(path)
+        rule_based_score, rule_based_breakdown = analyzer.calculate_ats_score(resume_data, job_index)
+
+        if mode == "rules":
+            return {
+                "file": path,
+                "mode": mode,
+                "ats_score": rule_based_score,
+                "rule_based_score": rule_based_score,
+                "rule_based_breakdown": rule_based_breakdown,
+                "elapsed_seconds": round(time.perf_counter() - start, 3)
+            }
+        if mode == "fast":
+            ai_analysis = analyzer.analyze_resume_locally(resume_data, rule_based_score, rule_based_breakdown)
+        else:
+            # Bound the number of concurrent Groq requests independently of the worker count
+            with llm_slots:
+                ai_analysis = analyzer.analyze_resume_with_ai(resume_data, rule_based_score, rule_based_breakdown)
+
+        job_match = None
+        if job_index is not None:
+            match = job_index.match(resume_data)
+            job_match = round(match["coverage"], 4)
+            ai_analysis["keywords_found"] = match["keywords_found"]
+            ai_analysis["keywords_missing"] = match["keywords_missing"]
+
+        ats_score = ai_analysis.get("ats_score", rule_based_score)
+        return {
+            "file": path,
+            "mode": mode,
+            "job_match": job_match,
+            "ats_score": ats_score,
+            "rule_based_score": rule_based_score,
+            "rule_based_breakdown": rule_based_breakdown,
+            "analysis": ai_analysis,
+            "suggestions": analyzer.get_improvement_suggestions(resume_data, ats_score),
+            "elapsed_seconds": round(time.perf_counter() - start, 3)
+        }
+    except Exception as e:
+        return {
+            "file": path,
+            "error": str(e),
+            "elapsed_seconds": round(time.perf_counter() - start, 3)
+        }
+
+
+def run_batch(paths: Iterable, output_path: str, analyzer: ResumeAnalyzer, workers: int = 8,
+              max_in_flight: int = 4, mode: str = "ai", job_index: JobDescriptionIndex = None,
+              store: ResumeStore = None) -> Dict:
+    """Analyze paths concurrently, appending one JSON line per resume as soon as it finishes.
+
+    Items may also be (source, resume_data) pairs of already parsed resumes.
+    """
+    llm_slots = threading.Semaphore(max_in_flight)
+    stats = {"total": 0, "succeeded": 0, "failed": 0}
+    start = time.perf_counter()
+
+    def submit(pool, item):
+        if isinstance(item, tuple):
+            source, resume_data = item
+            return pool.submit(analyze_file, source, analyzer, llm_slots, mode, job_index, resume_data=resume_data)
+        return pool.submit(analyze_file, item, analyzer, llm_slots, mode, job_index, store)
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        items = iter(paths)
+        pending = set()
+        while True:
+            # Keep a bounded window of submitted work so a store of 50k resumes is never all in memory
+            for item in items:
+                pending.add(submit(pool, item))
+                stats["total"] += 1
+                if len(pending) >= workers * 4:
+                    break
+            if not pending:
+                break
+            done = next(as_completed(pending))
+            pending.remove(done)
+            record = done.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            # Flush every record so partial results survive a crash
+            out.flush()
+            if "error" in record:
+                stats["failed"] += 1
+                print(f"FAILED {record['file']}: {record['error']}", file=sys.stderr)
+            else:
+                stats["succeeded"] += 1
+                print(f"{record['ats_score']:>3}  {record['file']}", file=sys.stderr)
+
+    stats["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+def rank_resumes(items: Iterable[Tuple[str, Dict]], job_index: JobDescriptionIndex, top_k: int = None) -> List[Dict]:
+    """BM25-rank (source, resume_data) pairs against one job description, best match first"""
+    sources = []
+    resumes = []
+    for source, resume_data in items:
+        sources.append(source)
+        resumes.append(resume_data)
+    ranking = []
+    for rank, (position, score) in enumerate(job_index.rank(resumes, top_k), 1):
+        match = job_index.match(resumes[position])
+        ranking.append({
+            "rank": rank,
+            "file": sources[position],
+            "bm25": round(score, 4),
+            "job_match": round(match["coverage"], 4),
+            "keywords_missing": match["keywords_missing"]
+        })
+    return ranking
+
+
+def parse_pdfs(paths: List[str], workers: int = 8, store: ResumeStore = None) -> Iterable[Tuple[str, Dict]]:
+    """Yield (path, resume_data) for every PDF that parses, reporting failures on stderr"""
+    def parse(path):
+        try:
+            if store is not None:
+                return path, load_resume_data(path, store)[1]
+            return path, extract_resume_data(path)
+        except Exception as e:
+            print(f"FAILED {path}: {e}", file=sys.stderr)
+            return path, None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for path, resume_data in pool.map(parse, paths):
+            if resume_data is not None:
+                yield path, resume_data
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze many resume PDFs and write results as JSONL")
+    parser.add_argument("inputs", nargs="*", help="PDF files, directories or glob patterns")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSONL output file (appended to)")
+    parser.add_argument("--workers", type=int, default=8, help="number of worker threads")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="maximum concurrent Groq requests")
+    parser.add_argument("--mode", choices=["ai", "fast", "rules"], default="ai",
+                        help="ai: Groq analysis; fast: local rule-based analysis with no LLM calls; "
+                             "rules: rule-based score only")
+    parser.add_argument("--job-description", metavar="FILE",
+                        help="text file with a job description to match every resume against")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="append a JSON line with per-stage timings and counters when the run finishes")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="re-analyze files already present in the output file")
+    parser.add_argument("--no-cache", action="store_true", help="disable the persistent analysis cache")
+    parser.add_argument("--store", action="store_true",
+                        help="keep parsed resumes in the resume store and skip re-parsing PDFs already in it")
+    parser.add_argument("--store-path", metavar="FILE",
+                        default=os.getenv("RESUME_STORE_PATH", DEFAULT_STORE_PATH),
+                        help="resume store used by --store and --from-store (default: RESUME_STORE_PATH)")
+    parser.add_argument("--from-store", action="store_true",
+                        help="rescore every resume in the store instead of reading PDFs")
+    parser.add_argument("--rank", metavar="N", type=int, nargs="?", const=20,
+                        help="instead of analyzing, print the N resumes (default 20; 0 for all) that best match "
+                             "--job-description as JSON lines, ranked by BM25")
+    args = parser.parse_args(argv)
+    if args.rank is not None and not args.job_description:
+        parser.error("--rank needs --job-description")
+
+    store = None
+    if args.store or args.from_store:
+        store = ResumeStore(args.store_path)
+
+    if args.rank is not None:
+        if args.from_store:
+            items = ((source or file_hash, resume_data) for file_hash, source, resume_data in store.iter_resumes())
+        elif args.inputs:
+            items = parse_pdfs(collect_pdfs(args.inputs), args.workers, store)
+        else:
+            parser.error("give PDF inputs or --from-store")
+        with open(args.job_description, encoding="utf-8") as f:
+            job_index = JobDescriptionIndex(f.read())
+        for record in rank_resumes(items, job_index, args.rank or None):
+            print(json.dumps(record, ensure_ascii=False))
+        if args.metrics:
+            metrics.write_jsonl(args.metrics)
+        return 0
+    completed = set() if args.no_resume else load_completed(args.output)
+
+    if args.from_store:
+        paths = ((source or file_hash, resume_data) for file_hash, source, resume_data in store.iter_resumes()
+                 if (source or file_hash) not in completed)
+    else:
+        if not args.inputs:
+            parser.error("give PDF inputs or --from-store")
+        paths = [p for p in collect_pdfs(args.inputs) if p not in completed]
+        if not paths:
+            print("No PDFs to analyze", file=sys.stderr)
+            return 0
+
+    job_index = None
+    if args.job_description:
+        with open(args.job_description, encoding="utf-8") as f:
+            job_index = JobDescriptionIndex(f.read())
+
+    analyzer = ResumeAnalyzer.from_env(use_cache=not args.no_cache)
+    try:
+        stats = run_batch(paths, args.output, analyzer, workers=args.workers, max_in_flight=args.max_in_flight,
+                          mode=args.mode, job_index=job_index, store=store)
+    finally:
+        analyzer.close()
+    print(json.dumps(stats), file=sys.stderr)
+    if args.metrics:
+        metrics.write_jsonl(args.metrics)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Benchmark PDF text extraction backends on a synthetic resume corpus.
+
+    python benchmarks/bench_extraction.py --resumes 30
+
+Reports pages/sec and how often text_quality_issue() rejects each backend's
+output, then the same for extract_text_from_pdf (fast backend plus pdfplumber
+fallback) with the backend selected by PDF_BACKEND.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_parser import EXTRACTION_BACKENDS, PDF_BACKEND, extract_text_from_pdf, text_quality_issue  # noqa: E402
+from metrics import metrics  # noqa: E402
+from corpus import generate_corpus  # noqa: E402
+
+
+def bench_backend(name: str, paths, repeat: int):
+    """Return (best pages/sec, share of documents whose output fails the quality check)"""
+    backend = EXTRACTION_BACKENDS[name]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        documents = [list(backend(path, 0)) for path in paths]
+        best = min(best, time.perf_counter() - start)
+    pages = sum(len(document) for document in documents)
+    rejected = sum(1 for document in documents if text_quality_issue(document) is not None)
+    return pages / best, rejected / len(paths)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=30)
+    parser.add_argument("--max-pages", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        paths = generate_corpus(out_dir, args.resumes, args.seed, args.max_pages)
+
+        print(f"{'backend':<12} {'pages/sec':>10} {'rejected':>9}")
+        rates = {}
+        for name in EXTRACTION_BACKENDS:
+            rate, rejected = bench_backend(name, paths, args.repeat)
+            rates[name] = rate
+            print(f"{name:<12} {rate:>10,.1f} {rejected:>9.0%}")
+
+        metrics.reset()
+        start = time.perf_counter()
+        for path in paths:
+            extract_text_from_pdf(path, max_pages=0)
+        elapsed = time.perf_counter() - start
+        counters = metrics.snapshot()["counters"]
+        pages = counters.get("pdf_pages", 0)
+        fallbacks = counters.get("pdf_backend_fallbacks", 0)
+        print(f"\nextract_text_from_pdf (PDF_BACKEND={PDF_BACKEND}): {pages / elapsed:,.1f} pages/sec "
+              f"({pages / elapsed / rates['pdfplumber']:.1f}x pdfplumber), fallback rate {fallbacks / len(paths):.0%}")
+
+
+if __name__ == "__main__":
+    main()
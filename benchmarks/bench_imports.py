@@ -0,0 +1,67 @@
+"""Benchmark cold-start import time of the analyzer modules.
+
+    python benchmarks/bench_imports.py --repeat 7
+    python benchmarks/bench_imports.py --modules resume_analyzer --top 15
+
+Each import runs in a fresh interpreter, as it does for a newly started worker.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ("pdf_parser", "resume_analyzer", "bulk_scoring", "batch", "job_queue")
+
+# Heavy dependencies that should only be loaded when they are actually used
+HEAVY = ("groq", "httpx", "dotenv", "pdfplumber", "pdfminer", "numpy", "pandas")
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_wall_ms(module: str) -> float:
+    """Wall-clock milliseconds for a fresh interpreter to start and import module"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=ROOT, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def import_profile(module: str):
+    """Return (cumulative ms per top-level package, heavy packages loaded) from -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            check=True, capture_output=True, text=True)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            name = match.group(4)
+            cumulative[name] = int(match.group(2)) / 1000
+    loaded = [name for name in HEAVY if name in cumulative]
+    return cumulative, loaded
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=list(MODULES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest imports of each module")
+    args = parser.parse_args(argv)
+
+    baseline = statistics.median(import_wall_ms("sys") for _ in range(args.repeat))
+    print(f"{'module':<18} {'wall ms':>9} {'import ms':>10}  heavy dependencies loaded")
+    for module in args.modules:
+        wall = statistics.median(import_wall_ms(module) for _ in range(args.repeat)) - baseline
+        cumulative, loaded = import_profile(module)
+        print(f"{module:<18} {wall:>9.1f} {cumulative.get(module, 0.0):>10.1f}  {', '.join(loaded) or '-'}")
+        if args.top:
+            slowest = sorted(cumulative.items(), key=lambda item: -item[1])[1:args.top + 1]
+            for name, ms in slowest:
+                print(f"    {name:<40} {ms:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
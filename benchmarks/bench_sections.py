@@ -0,0 +1,75 @@
+"""Benchmark parse_resume_sections on a synthetic resume corpus.
+
+    python benchmarks/bench_sections.py --resumes 2000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_parser import parse_resume_sections  # noqa: E402
+from corpus import synthetic_resume  # noqa: E402
+
+
+def legacy_parse_resume_sections(text: str) -> dict:
+    """The original per-line re.search loop, kept for comparison"""
+    section_patterns = {
+        "contact_info": r"(contact|personal information|personal details)",
+        "summary": r"(summary|profile|objective|about|professional summary)",
+        "experience": r"(experience|work experience|employment|work history|professional experience)",
+        "education": r"(education|academic|qualification)",
+        "skills": r"(skills|technical skills|core competencies|expertise)",
+        "certifications": r"(certification|certificates|licenses)",
+        "projects": r"(projects|personal projects|academic projects)"
+    }
+    lines = text.split('\n')
+    current_section = "other"
+    section_content = {key: [] for key in list(section_patterns) + ["other"]}
+    section_content["contact_info"] = lines[:5]
+    for line in lines:
+        line_lower = line.lower().strip()
+        matched = False
+        for section, pattern in section_patterns.items():
+            if re.search(pattern, line_lower, re.IGNORECASE):
+                current_section = section
+                matched = True
+                break
+        if not matched and line.strip():
+            section_content[current_section].append(line)
+    return {key: '\n'.join(value).strip() for key, value in section_content.items()}
+
+
+def bench(func, corpus, repeat: int) -> float:
+    """Return the best lines/sec over repeat runs"""
+    total_lines = sum(text.count("\n") + 1 for text in corpus)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return total_lines / best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    corpus = [synthetic_resume(rng) for _ in range(args.resumes)]
+
+    legacy = bench(legacy_parse_resume_sections, corpus, args.repeat)
+    current = bench(parse_resume_sections, corpus, args.repeat)
+    print(f"legacy  re.search loop: {legacy:>12,.0f} lines/sec")
+    print(f"compiled classifier:    {current:>12,.0f} lines/sec  ({current / legacy:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
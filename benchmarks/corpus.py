@@ -0,0 +1,124 @@
+"""Synthetic resume corpus: plain-text resumes and minimal PDFs of varying length and layout.
+
+    python benchmarks/corpus.py --out benchmarks/corpus --count 50
+"""
+import argparse
+import os
+import random
+from typing import List
+
+HEADERS = {
+    "summary": ["SUMMARY", "Professional Summary", "Profile", "About Me"],
+    "experience": ["EXPERIENCE", "Work Experience", "Professional Experience:", "Employment History"],
+    "education": ["EDUCATION", "Education", "Academic Background"],
+    "skills": ["SKILLS", "Technical Skills", "Core Competencies", "Skills & Tools"],
+    "certifications": ["CERTIFICATIONS", "Licenses & Certifications"],
+    "projects": ["PROJECTS", "Personal Projects"]
+}
+
+WORDS = ("led built designed shipped improved reduced increased managed python sql docker kubernetes "
+         "react team customers pipeline latency revenue about experience profile education skills "
+         "projects summary objective platform analytics migration cloud aws azure services api").split()
+
+LAYOUTS = ("single", "two_column", "dense")
+
+
+def synthetic_resume_lines(rng: random.Random, min_items: int = 3, max_items: int = 25) -> List[str]:
+    """Generate the lines of one resume with a random section order and length"""
+    lines = ["Jane Doe", "jane.doe@example.com | 555-123-4567", "linkedin.com/in/janedoe", ""]
+    sections = list(HEADERS)
+    rng.shuffle(sections)
+    for section in sections:
+        lines.append(rng.choice(HEADERS[section]))
+        for _ in range(rng.randint(min_items, max_items)):
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18)))
+            metric = f" by {rng.randint(5, 60)}%" if rng.random() < 0.3 else ""
+            lines.append("- " + words.capitalize() + metric)
+        lines.append("")
+    return lines
+
+
+def synthetic_resume(rng: random.Random) -> str:
+    """Generate one plain-text resume"""
+    return "\n".join(synthetic_resume_lines(rng))
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(lines: List[str], layout: str = "single", lines_per_page: int = 48) -> bytes:
+    """Render lines into a minimal text-only PDF using the built-in Helvetica font"""
+    if layout == "dense":
+        lines_per_page, font_size, leading = 80, 8, 9
+    else:
+        font_size, leading = 10, 15
+    columns = 2 if layout == "two_column" else 1
+    per_page = lines_per_page * columns
+    pages = [lines[i:i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    pages_id = 1 + 2 * len(pages) + 1
+    page_ids = []
+    for page_lines in pages:
+        parts = []
+        for column in range(columns):
+            chunk = page_lines[column * lines_per_page:(column + 1) * lines_per_page]
+            if not chunk:
+                continue
+            x = 50 + column * 280
+            body = " ".join(f"({_escape(line)}) Tj T*" for line in chunk)
+            parts.append(f"BT /F1 {font_size} Tf {leading} TL {x} 760 Td {body} ET")
+        stream = "\n".join(parts).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 1 0 R >> >> >>" % (pages_id, content_id)
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects.append(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids)))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, len(objects), xref)
+    return out
+
+
+def generate_corpus(out_dir: str, count: int, seed: int = 1, max_pages: int = 6) -> List[str]:
+    """Write count synthetic resume PDFs of 1..max_pages pages and mixed layouts; return their paths"""
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        layout = LAYOUTS[i % len(LAYOUTS)]
+        pages = rng.randint(1, max_pages)
+        lines = synthetic_resume_lines(rng, min_items=pages * 2, max_items=pages * 7)
+        path = os.path.join(out_dir, f"resume_{i:04d}_{layout}.pdf")
+        with open(path, "wb") as f:
+            f.write(make_pdf(lines, layout))
+        paths.append(path)
+    return paths
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume PDF corpus")
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus"))
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-pages", type=int, default=6)
+    args = parser.parse_args(argv)
+    paths = generate_corpus(args.out, args.count, args.seed, args.max_pages)
+    print(f"Wrote {len(paths)} PDFs to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Reproducible benchmark suite for the resume analysis pipeline.
+
+Generates a synthetic PDF corpus, starts a local stub of the Groq endpoint and
+measures throughput and latency percentiles per function and end to end.
+Results are saved per commit so regressions can be compared:
+
+    python benchmarks/run.py --count 40 --llm-latency 0.3
+    python benchmarks/run.py --compare benchmarks/results/<old-commit>.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from corpus import generate_corpus  # noqa: E402
+from stub_groq import start_stub_server  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(latencies: List[float], wall_seconds: float) -> Dict:
+    """Throughput and latency percentiles (milliseconds) for one benchmark"""
+    ordered = sorted(latencies)
+    return {
+        "runs": len(ordered),
+        "throughput_per_sec": round(len(ordered) / wall_seconds, 3) if wall_seconds else 0.0,
+        "mean_ms": round(1000 * sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(1000 * percentile(ordered, 0.50), 3),
+        "p95_ms": round(1000 * percentile(ordered, 0.95), 3),
+        "p99_ms": round(1000 * percentile(ordered, 0.99), 3),
+        "max_ms": round(1000 * ordered[-1], 3) if ordered else 0.0
+    }
+
+
+def measure(func: Callable, inputs: List, repeat: int = 1, concurrency: int = 1) -> Dict:
+    """Call func on every input (repeat times), optionally from a thread pool"""
+    items = list(inputs) * repeat
+
+    def timed(item):
+        start = time.perf_counter()
+        func(item)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, items))
+    else:
+        latencies = [timed(item) for item in items]
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(args) -> Dict:
+    corpus_dir = args.corpus or tempfile.mkdtemp(prefix="resume-corpus-")
+    paths = generate_corpus(corpus_dir, args.count, seed=args.seed, max_pages=args.max_pages)
+
+    server, base_url = start_stub_server(
+        latency=args.llm_latency, jitter=args.llm_jitter, failure_rate=args.llm_failure_rate,
+        retry_after=0.05
+    )
+    # The analyzer reads these when it is constructed
+    os.environ["GROQ_BASE_URL"] = base_url
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+
+    from pdf_parser import extract_resume_data, extract_text_from_pdf, parse_resume_sections
+    from resume_analyzer import ResumeAnalyzer
+
+    analyzer = ResumeAnalyzer()
+    texts = [extract_text_from_pdf(path) for path in paths]
+    parsed = []
+    for path, text in zip(paths, texts):
+        sections = parse_resume_sections(text)
+        sections["full_text"] = text
+        parsed.append(sections)
+    scored = [(data, *analyzer.calculate_ats_score(data)) for data in parsed]
+    # One untimed analysis pays for the lazy groq import and client creation, which would
+    # otherwise land in the first timed samples and skew p50 on small corpora
+    analyzer.analyze_resume_with_ai(*scored[0])
+
+    def end_to_end(path):
+        resume_data = extract_resume_data(path)
+        score, breakdown = analyzer.calculate_ats_score(resume_data)
+        analysis = analyzer.analyze_resume_with_ai(resume_data, score, breakdown)
+        analyzer.get_improvement_suggestions(resume_data, analysis.get("ats_score", score))
+
+    results = {
+        "extract_resume_data": measure(extract_resume_data, paths),
+        "parse_resume_sections": measure(parse_resume_sections, texts, repeat=args.repeat),
+        "calculate_ats_score": measure(analyzer.calculate_ats_score, parsed, repeat=args.repeat),
+        "analyze_resume_with_ai": measure(lambda item: analyzer.analyze_resume_with_ai(*item), scored,
+                                          concurrency=args.concurrency),
+        "end_to_end": measure(end_to_end, paths, concurrency=args.concurrency)
+    }
+    server.shutdown()
+
+    return {
+        "revision": git_revision(),
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "config": {
+            "count": args.count,
+            "seed": args.seed,
+            "max_pages": args.max_pages,
+            "repeat": args.repeat,
+            "concurrency": args.concurrency,
+            "llm_latency": args.llm_latency,
+            "llm_jitter": args.llm_jitter,
+            "llm_failure_rate": args.llm_failure_rate
+        },
+        "results": results
+    }
+
+
+def print_report(report: Dict, baseline: Dict = None) -> None:
+    print(f"revision {report['revision']}  config {json.dumps(report['config'])}")
+    header = f"{'benchmark':<24}{'ops/s':>12}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}"
+    if baseline:
+        header += f"{'p50 vs base':>14}"
+    print(header)
+    for name, stats in report["results"].items():
+        line = (f"{name:<24}{stats['throughput_per_sec']:>12.1f}{stats['p50_ms']:>12.3f}"
+                f"{stats['p95_ms']:>12.3f}{stats['p99_ms']:>12.3f}")
+        base = (baseline or {}).get("results", {}).get(name)
+        if base and base["p50_ms"]:
+            line += f"{(stats['p50_ms'] / base['p50_ms'] - 1) * 100:>+13.1f}%"
+        print(line)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the resume analysis pipeline")
+    parser.add_argument("--count", type=int, default=30, help="number of synthetic PDFs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-pages", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20, help="repeats for the fast in-memory benchmarks")
+    parser.add_argument("--concurrency", type=int, default=4, help="threads for the LLM-bound benchmarks")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="stub Groq latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.05)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0, help="fraction of stub 429 responses")
+    parser.add_argument("--corpus", help="directory for the generated PDFs (default: a temp dir)")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<revision>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"Saved results to {output}")
+
+
+if __name__ == "__main__":
+    main()
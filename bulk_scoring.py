@@ -0,0 +1,90 @@
+"""Vectorized rule-based ATS scoring for large applicant pools.
+
+Computes the same scores as ResumeAnalyzer.calculate_ats_score, but column by
+column with pandas string operations, so a pool can be pre-filtered before any
+LLM spend:
+
+    scores, breakdown = score_resumes_bulk(parsed_resumes)
+    shortlist = [r for r, s in zip(parsed_resumes, scores) if s >= 60]
+"""
+from typing import Dict, Iterable, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from job_matching import JOB_MATCH_POINTS, JobDescriptionIndex
+from resume_analyzer import EMAIL_PATTERN, PHONE_PATTERN, PROFILE_LINK_WORDS, SCORE_WEIGHTS
+from metrics import metrics
+
+# Column order of the breakdown matrix; "job_match" is appended when a job index is given
+BREAKDOWN_COLUMNS = tuple(SCORE_WEIGHTS)
+
+_TEXT_COLUMNS = ("contact_info", "summary", "experience", "education", "skills", "full_text")
+
+_PROFILE_LINK_PATTERN = "|".join(PROFILE_LINK_WORDS)
+
+
+def _to_frame(resumes) -> pd.DataFrame:
+    """Accept a DataFrame, an Arrow table or an iterable of parsed-resume dicts"""
+    if isinstance(resumes, pd.DataFrame):
+        frame = resumes
+    elif hasattr(resumes, "to_pandas"):
+        frame = resumes.to_pandas()
+    else:
+        frame = pd.DataFrame.from_records(list(resumes), columns=list(_TEXT_COLUMNS))
+    # Missing sections are empty strings, exactly as resume_data.get() treats them
+    return pd.DataFrame({
+        name: frame[name].fillna("").astype(str) if name in frame else pd.Series("", index=frame.index)
+        for name in _TEXT_COLUMNS
+    })
+
+
+@metrics.timed("score_resumes_bulk")
+def score_resumes_bulk(resumes: Union[pd.DataFrame, Iterable[Dict[str, str]]],
+                       job_index: JobDescriptionIndex = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (scores, breakdown) for many parsed resumes at once.
+
+    scores is an int array with one total per resume; breakdown is an
+    (n_resumes, n_categories) int matrix in BREAKDOWN_COLUMNS order, plus a
+    trailing job_match column when job_index is given (totals then rescaled to 100).
+    """
+    frame = _to_frame(resumes)
+    contact = frame["contact_info"]
+    lengths = {name: frame[name].str.len().to_numpy() for name in _TEXT_COLUMNS}
+
+    has_email = contact.str.contains(EMAIL_PATTERN, regex=True).to_numpy()
+    has_phone = contact.str.contains(PHONE_PATTERN, regex=True).to_numpy()
+    has_link = contact.str.lower().str.contains(_PROFILE_LINK_PATTERN, regex=True).to_numpy()
+    contact_info = 5 * (has_email.astype(np.int64) + has_phone + has_link)
+
+    summary = np.where(lengths["summary"] > 50, 15, 0)
+
+    experience_length = lengths["experience"]
+    experience = np.select(
+        [experience_length > 200, experience_length > 100, experience_length > 0], [30, 20, 10], default=0
+    )
+
+    education = np.where(lengths["education"] > 30, 20, 0)
+
+    skills = frame["skills"]
+    skill_count = (skills.str.count(",") + skills.str.count("\n")).to_numpy() + 2
+    skills_points = np.select(
+        [lengths["skills"] == 0, skill_count > 10, skill_count > 5], [0, 15, 10], default=5
+    )
+
+    full_text_length = lengths["full_text"]
+    formatting = np.where((full_text_length > 500) & (full_text_length < 5000), 5, 0)
+
+    columns = [contact_info, summary, experience, education, skills_points, formatting]
+    if job_index is not None:
+        # Keyword coverage needs per-resume term analysis, so only this column loops in Python
+        records = frame.to_dict("records")
+        coverage = np.array([job_index.match(record)["coverage"] for record in records])
+        columns.append(np.round(coverage * JOB_MATCH_POINTS))
+
+    breakdown = np.column_stack(columns).astype(np.int64)
+    totals = breakdown.sum(axis=1)
+    if job_index is not None:
+        totals = np.round(totals * 100 / (100 + JOB_MATCH_POINTS))
+    metrics.increment("bulk_scored_resumes", len(frame))
+    return totals.astype(np.int64), breakdown
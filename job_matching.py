@@ -0,0 +1,153 @@
+import math
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple, Union
+
+from local_analysis import KEYWORD_LEXICON, find_keywords
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Points a job-description match adds to the rule-based breakdown
+JOB_MATCH_POINTS = 20
+
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could do does
+during each either etc for from had has have having he her his how i if in into is it its job join may
+more most must need needs new not of on one or our ours out over per plus role should so some such than
+that the their them then there these they this those through to under up us use using very via was we
+well were what when where which while who will with within without work working would year years you
+your team teams candidate candidates ideal strong experience experienced ability able etc
+""".split())
+
+# Common abbreviations and spellings mapped to one canonical term
+SYNONYMS = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "amazon web services": "aws",
+    "google cloud": "gcp",
+    "google cloud platform": "gcp",
+    "sklearn": "scikit-learn",
+    "powerbi": "power bi",
+    "cicd": "ci/cd",
+    "ci cd": "ci/cd"
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+_PHRASE_SYNONYM_RE = re.compile(
+    r"\b(" + "|".join(re.escape(p) for p in sorted((k for k in SYNONYMS if " " in k), key=len, reverse=True)) + r")\b"
+)
+# Known skills and canonical synonyms are matched verbatim, never stemmed
+_VOCABULARY = frozenset(k for keywords in KEYWORD_LEXICON.values() for k in keywords) | frozenset(SYNONYMS.values())
+_SUFFIXES = (("sses", "ss"), ("ies", "y"), ("ing", ""), ("ed", ""), ("s", ""))
+
+# Skills from the shared lexicon weigh more than ordinary job-description words
+SKILL_BOOST = 2.0
+
+
+def stem(word: str) -> str:
+    """Light suffix-stripping stemmer so "managed", "manages" and "managing" meet"""
+    if len(word) <= 4 or not word.isalpha():
+        return word
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and not word.endswith("ss") and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)] + replacement
+            break
+    return word[:-1] if word.endswith("e") and len(word) > 4 else word
+
+
+def analyze_text(text: str) -> List[str]:
+    """Tokenize, normalise synonyms, drop stopwords and stem; lexicon phrases become single terms"""
+    text = _PHRASE_SYNONYM_RE.sub(lambda m: SYNONYMS[m.group(1)], text.lower())
+    terms = [keyword for keyword in find_keywords(text) if " " in keyword]
+    for token in _TOKEN_RE.findall(text):
+        token = SYNONYMS.get(token, token)
+        if token in STOPWORDS or token.isdigit():
+            continue
+        terms.append(token if token in _VOCABULARY else stem(token))
+    return terms
+
+
+def _resume_text(resume: Union[str, Dict[str, str]]) -> str:
+    if isinstance(resume, str):
+        return resume
+    return resume.get("full_text") or "\n".join(v for k, v in resume.items() if v)
+
+
+class JobDescriptionIndex:
+    """A job description normalised once into weighted terms, reused to score many resumes"""
+
+    def __init__(self, job_description: str, max_terms: int = 60):
+        # numpy is only imported once a job description is actually given
+        import numpy as np
+        self.job_description = job_description
+        counts = Counter(analyze_text(job_description))
+        skills = {term for term in counts if term in _VOCABULARY}
+
+        # Skills first, then the most frequent remaining job-description terms
+        ranked = sorted(counts, key=lambda t: (t not in skills, -counts[t]))
+        self.terms = ranked[:max_terms]
+        self.term_index = {term: i for i, term in enumerate(self.terms)}
+        self.skills = [term for term in self.terms if term in skills]
+        self.weights = np.array(
+            [(1.0 + math.log(counts[t])) * (SKILL_BOOST if t in skills else 1.0) for t in self.terms]
+        )
+
+    def vectorize(self, resumes: Sequence[Union[str, Dict[str, str]]]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Return (term counts matrix of shape [n_resumes, n_terms], resume lengths in terms)"""
+        import numpy as np
+        counts = np.zeros((len(resumes), len(self.terms)), dtype=np.float32)
+        lengths = np.zeros(len(resumes), dtype=np.float32)
+        for row, resume in enumerate(resumes):
+            terms = analyze_text(_resume_text(resume))
+            lengths[row] = len(terms)
+            for term in terms:
+                column = self.term_index.get(term)
+                if column is not None:
+                    counts[row, column] += 1
+        return counts, lengths
+
+    def bm25(self, resumes: Sequence[Union[str, Dict[str, str]]], k1: float = 1.5, b: float = 0.75) -> "np.ndarray":
+        """BM25 relevance of each resume to the job description, computed over the whole pool at once"""
+        import numpy as np
+        if not resumes or not self.terms:
+            return np.zeros(len(resumes))
+        counts, lengths = self.vectorize(resumes)
+        n_docs = len(resumes)
+        doc_freq = (counts > 0).sum(axis=0)
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+        tf = counts * (k1 + 1) / (counts + norm[:, None])
+        return tf @ (idf * self.weights)
+
+    def rank(self, resumes: Sequence[Union[str, Dict[str, str]]], top_k: int = None) -> List[Tuple[int, float]]:
+        """Return (resume position, BM25 score) pairs, best match first"""
+        import numpy as np
+        scores = self.bm25(resumes)
+        order = np.argsort(-scores, kind="stable")
+        if top_k is not None:
+            order = order[:top_k]
+        return [(int(i), float(scores[i])) for i in order]
+
+    def match(self, resume: Union[str, Dict[str, str]]) -> Dict:
+        """Weighted coverage of job-description terms in one resume, plus found/missing skills"""
+        if not self.terms:
+            return {"coverage": 0.0, "keywords_found": [], "keywords_missing": []}
+        counts, _ = self.vectorize([resume])
+        present = counts[0] > 0
+        coverage = float(self.weights[present].sum() / self.weights.sum())
+        return {
+            "coverage": coverage,
+            "keywords_found": [t for t in self.skills if present[self.term_index[t]]],
+            "keywords_missing": [t for t in self.skills if not present[self.term_index[t]]]
+        }
@@ -0,0 +1,436 @@
+"""SQLite-backed job queue and worker processes for resume analysis.
+
+The app enqueues uploads and polls for results, so a slow Groq call never
+blocks a Streamlit session and results survive reruns and reconnects. Workers
+can also be run on their own, e.g. to scale analysis throughput separately:
+
+    python job_queue.py --workers 4
+"""
+import argparse
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+from job_matching import JobDescriptionIndex
+from metrics import PipelineMetrics, metrics
+from pdf_parser import PDF_SANDBOX, SPOOL_CHUNK_BYTES, extract_resume_data, extract_resume_data_isolated
+from resume_analyzer import ResumeAnalyzer, split_llm_limits
+from resume_store import DEFAULT_STORE_PATH, ResumeStore, file_sha256, load_resume_data
+from storage import cache_path, connect
+
+DEFAULT_QUEUE_PATH = cache_path('jobs.sqlite3')
+
+# A running job whose worker has not sent a heartbeat for this long is handed to another worker
+STALE_AFTER_SECONDS = 120
+HEARTBEAT_SECONDS = 10
+# Workers publish their metrics for the app at most this often, and once more when they go idle
+METRICS_PUBLISH_SECONDS = 2
+# Finished jobs are kept this long so reloading the page still shows the result
+KEEP_FINISHED_SECONDS = 7 * 24 * 3600
+MAX_ATTEMPTS = 3
+# Results carry only the start of each section, which is all the app shows
+SECTION_PREVIEW_CHARS = 500
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def make_job_id(upload: str, params: Dict) -> str:
+    """Jobs are content-addressed, so re-submitting the same upload and options returns the same job"""
+    digest = hashlib.sha256(upload.encode("utf-8"))
+    digest.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+class JobQueue:
+    """Durable FIFO of analysis jobs shared by the app and any number of worker processes"""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = path
+        # Uploads are spooled here, named by content hash, rather than held in memory or in the database
+        self.uploads_dir = os.path.join(os.path.dirname(os.path.abspath(path)), "uploads")
+        os.makedirs(self.uploads_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # Claims use BEGIN IMMEDIATE, so manage transactions explicitly
+        self._conn = connect(path, isolation_level=None, timeout=30)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                upload TEXT,
+                stage TEXT,
+                partial TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                heartbeat_at REAL,
+                finished_at REAL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        # Latest metrics export of each worker process, so the app can show pipeline metrics it never ran
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS worker_metrics (
+                worker TEXT PRIMARY KEY,
+                metrics TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._migrate_payloads()
+
+    def _migrate_payloads(self) -> None:
+        # Queues written before uploads were spooled to disk kept each PDF in a payload column
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "upload" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN upload TEXT")
+                for job_id, payload in self._conn.execute(
+                        "SELECT id, payload FROM jobs WHERE payload IS NOT NULL").fetchall():
+                    self._conn.execute("UPDATE jobs SET upload = ?, payload = NULL WHERE id = ?",
+                                       (self.save_upload(io.BytesIO(payload)), job_id))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def upload_path(self, upload: str) -> str:
+        return os.path.join(self.uploads_dir, f"{upload}.pdf")
+
+    def save_upload(self, pdf_file) -> str:
+        """Copy a file-like upload to the uploads directory in chunks and return its content hash"""
+        pdf_file.seek(0)
+        with tempfile.NamedTemporaryFile(dir=self.uploads_dir, suffix=".part", delete=False) as spool:
+            shutil.copyfileobj(pdf_file, spool, SPOOL_CHUNK_BYTES)
+        upload = file_sha256(spool.name)
+        # Replacing an identical earlier copy also refreshes its age for remove_unused_uploads()
+        os.replace(spool.name, self.upload_path(upload))
+        return upload
+
+    def enqueue(self, upload: str, params: Dict) -> str:
+        """Add a job for an upload from save_upload() and return its id; an identical job that already
+        exists is returned as is"""
+        job_id = make_job_id(upload, params)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, status, params, upload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(params), upload, time.time())
+            )
+        if cursor.rowcount:
+            metrics.increment("jobs_enqueued")
+        return job_id
+
+    def retry(self, job_id: str) -> None:
+        """Put a failed job back in the queue"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = NULL, attempts = 0, created_at = ? "
+                "WHERE id = ? AND status = ? AND upload IS NOT NULL",
+                (QUEUED, time.time(), job_id, FAILED)
+            )
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Atomically take the oldest queued job, or return None if there is none"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, params, upload FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, started_at = ?, heartbeat_at = ?, "
+                        "attempts = attempts + 1, stage = NULL, partial = NULL WHERE id = ?",
+                        (RUNNING, worker, now, now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {"id": row[0], "params": json.loads(row[1]), "upload": row[2]}
+
+    def update(self, job_id: str, stage: str = None, partial: Dict = None) -> None:
+        """Record progress; also serves as the worker's heartbeat"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET heartbeat_at = ?, stage = COALESCE(?, stage), partial = COALESCE(?, partial) "
+                "WHERE id = ? AND status = ?",
+                (time.time(), stage, json.dumps(partial) if partial is not None else None, job_id, RUNNING)
+            )
+
+    def complete(self, job_id: str, result: Dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, partial = NULL, finished_at = ? WHERE id = ?",
+                (DONE, json.dumps(result), time.time(), job_id)
+            )
+        metrics.increment("jobs_completed")
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, partial = NULL, finished_at = ? WHERE id = ?",
+                (FAILED, error, time.time(), job_id)
+            )
+        metrics.increment("jobs_failed")
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Status, stage and partial or final result of a job"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, stage, partial, result, error, created_at, started_at, finished_at, "
+                "(SELECT COUNT(*) FROM jobs AS q WHERE q.status = 'queued' AND q.created_at < jobs.created_at) "
+                "FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, stage, partial, result, error, created_at, started_at, finished_at, ahead = row
+        return {
+            "id": job_id,
+            "status": status,
+            "stage": stage,
+            "partial": json.loads(partial) if partial else None,
+            "result": json.loads(result) if result else None,
+            "error": error,
+            "queue_position": ahead if status == QUEUED else 0,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at
+        }
+
+    def requeue_stale(self, stale_after: float = STALE_AFTER_SECONDS) -> int:
+        """Hand jobs of crashed workers back to the queue, failing those that keep crashing"""
+        cutoff = time.time() - stale_after
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = 'worker crashed repeatedly', finished_at = ? "
+                "WHERE status = ? AND heartbeat_at < ? AND attempts >= ?",
+                (FAILED, time.time(), RUNNING, cutoff, MAX_ATTEMPTS)
+            )
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL WHERE status = ? AND heartbeat_at < ?",
+                (QUEUED, RUNNING, cutoff)
+            )
+        return cursor.rowcount
+
+    def purge(self, older_than: float = KEEP_FINISHED_SECONDS) -> None:
+        """Delete finished jobs, and metrics of workers gone quiet, older than older_than seconds"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (DONE, FAILED, time.time() - older_than)
+            )
+            self._conn.execute("DELETE FROM worker_metrics WHERE updated_at < ?", (time.time() - older_than,))
+
+    def remove_unused_uploads(self, min_age: float = STALE_AFTER_SECONDS) -> int:
+        """Delete uploads no queued, running or failed (so retryable) job needs any more.
+
+        Files younger than min_age are kept: the app saves an upload just before enqueueing it.
+        """
+        with self._lock:
+            needed = {row[0] for row in self._conn.execute(
+                "SELECT DISTINCT upload FROM jobs WHERE status IN (?, ?, ?)", (QUEUED, RUNNING, FAILED))}
+        cutoff = time.time() - min_age
+        removed = 0
+        for name in os.listdir(self.uploads_dir):
+            path = os.path.join(self.uploads_dir, name)
+            if name.endswith(".pdf") and name[:-len(".pdf")] in needed:
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def publish_metrics(self, worker: str, exported: Dict) -> None:
+        """Store a worker's metrics.export(), replacing its previous one"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO worker_metrics (worker, metrics, updated_at) VALUES (?, ?, ?)",
+                (worker, json.dumps(exported), time.time())
+            )
+
+    def combined_metrics(self, local: PipelineMetrics = None) -> PipelineMetrics:
+        """Every worker's published metrics merged into one registry, plus local (e.g. the app's own)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT metrics FROM worker_metrics").fetchall()
+        combined = PipelineMetrics()
+        if local is not None:
+            combined.merge(local.export())
+        for (exported,) in rows:
+            combined.merge(json.loads(exported))
+        return combined
+
+    def counts(self) -> Dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, **dict(rows)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def process_job(job: Dict, queue: JobQueue, analyzer: ResumeAnalyzer, store: ResumeStore = None) -> Dict:
+    """Run extraction, scoring and analysis for one job, publishing progress as it goes"""
+    params = job["params"]
+    queue.update(job["id"], stage="extracting")
+    # The app spooled the upload to disk, so the worker reads it from there; with PDF_SANDBOX the
+    # file is parsed in a memory- and time-capped child process, so a hostile PDF only kills that
+    extract = extract_resume_data_isolated if PDF_SANDBOX else extract_resume_data
+    pdf_path = queue.upload_path(job["upload"])
+    if store is not None:
+        _, resume_data = load_resume_data(pdf_path, store, source=params.get("filename"), extract=extract)
+    else:
+        resume_data = extract(pdf_path)
+
+    queue.update(job["id"], stage="scoring")
+    job_description = (params.get("job_description") or "").strip()
+    job_index = JobDescriptionIndex(job_description) if job_description else None
+    rule_based_score, rule_based_breakdown = analyzer.calculate_ats_score(resume_data, job_index)
+
+    queue.update(job["id"], stage="analyzing")
+    if params.get("mode") == "fast":
+        ai_analysis = analyzer.analyze_resume_locally(resume_data, rule_based_score, rule_based_breakdown)
+    else:
+        ai_analysis = {}
+        last_update = 0.0
+        for ai_analysis in analyzer.stream_resume_analysis(resume_data, rule_based_score, rule_based_breakdown):
+            # Publish streamed fields for the UI to render, at most a few writes per second
+            if time.monotonic() - last_update > 0.25:
+                queue.update(job["id"], partial=ai_analysis)
+                last_update = time.monotonic()
+
+    # Keywords against a real job description beat keywords guessed by the model
+    if job_index is not None:
+        match = job_index.match(resume_data)
+        ai_analysis["keywords_found"] = match["keywords_found"]
+        ai_analysis["keywords_missing"] = match["keywords_missing"]
+
+    ats_score = ai_analysis.get("ats_score", rule_based_score)
+    return {
+        "rule_based_score": rule_based_score,
+        "rule_based_breakdown": rule_based_breakdown,
+        "analysis": ai_analysis,
+        "suggestions": analyzer.get_improvement_suggestions(resume_data, ats_score),
+        "sections": {name: _preview(content) for name, content in resume_data.items() if name != "full_text"}
+    }
+
+
+def _preview(content: str) -> str:
+    if len(content) > SECTION_PREVIEW_CHARS:
+        return content[:SECTION_PREVIEW_CHARS] + "..."
+    return content
+
+
+def _heartbeat(queue: JobQueue, job_id: str, stop: threading.Event) -> None:
+    while not stop.wait(HEARTBEAT_SECONDS):
+        queue.update(job_id)
+
+
+def run_worker(queue_path: str = DEFAULT_QUEUE_PATH, poll_interval: float = 0.5, parent_pid: int = None,
+               max_jobs: int = None) -> None:
+    """Claim and process jobs until stopped (or until the parent process exits)"""
+    queue = JobQueue(queue_path)
+    analyzer = ResumeAnalyzer.from_env()
+    store = ResumeStore(os.getenv("RESUME_STORE_PATH", DEFAULT_STORE_PATH))
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+    last_maintenance = 0.0
+    last_publish = 0.0
+    unpublished = False
+
+    try:
+        while max_jobs is None or processed < max_jobs:
+            if parent_pid is not None and os.getppid() != parent_pid:
+                return
+            if time.monotonic() - last_maintenance > STALE_AFTER_SECONDS / 4:
+                queue.requeue_stale()
+                queue.purge()
+                queue.remove_unused_uploads()
+                last_maintenance = time.monotonic()
+
+            if unpublished and time.monotonic() - last_publish > METRICS_PUBLISH_SECONDS:
+                queue.publish_metrics(worker, metrics.export())
+                last_publish = time.monotonic()
+                unpublished = False
+
+            job = queue.claim(worker)
+            if job is None:
+                if unpublished:
+                    # Going idle: publish now so the app sees the last job's metrics
+                    queue.publish_metrics(worker, metrics.export())
+                    last_publish = time.monotonic()
+                    unpublished = False
+                time.sleep(poll_interval)
+                continue
+
+            stop = threading.Event()
+            threading.Thread(target=_heartbeat, args=(queue, job["id"], stop), daemon=True).start()
+            try:
+                queue.complete(job["id"], process_job(job, queue, analyzer, store))
+            except Exception as e:
+                queue.fail(job["id"], str(e))
+            finally:
+                stop.set()
+            processed += 1
+            unpublished = True
+        if unpublished:
+            queue.publish_metrics(worker, metrics.export())
+    finally:
+        analyzer.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run resume analysis worker processes")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("JOB_WORKERS", "2")))
+    parser.add_argument("--queue", default=os.getenv("JOB_QUEUE_PATH", DEFAULT_QUEUE_PATH))
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--parent-pid", type=int, help="exit when this process is no longer our parent")
+    args = parser.parse_args(argv)
+
+    if args.workers <= 1:
+        run_worker(args.queue, args.poll_interval, args.parent_pid)
+        return
+
+    # Workers inherit this environment; each gets its share of the Groq rate limits
+    split_llm_limits(args.workers)
+
+    def spawn():
+        process = multiprocessing.Process(target=run_worker, args=(args.queue, args.poll_interval, os.getpid()),
+                                          daemon=True)
+        process.start()
+        return process
+
+    processes = [spawn() for _ in range(args.workers)]
+    try:
+        while args.parent_pid is None or os.getppid() == args.parent_pid:
+            # Replace crashed workers; their jobs are re-queued once their heartbeat goes stale
+            processes = [process if process.is_alive() else spawn() for process in processes]
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    for process in processes:
+        process.terminate()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
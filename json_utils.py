@@ -0,0 +1,247 @@
+import json
+import re
+from typing import Dict
+
+
+class IncrementalObjectParser:
+    """Parse the top-level fields of a JSON object as its text arrives in chunks.
+
+    feed() returns the fields completed by that chunk, so callers can act on
+    "ats_score" long before the closing brace of the object has been generated.
+    Text before the first "{" (e.g. a chatty preamble) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields = {}
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None
+
+    def feed(self, chunk: str) -> Dict:
+        """Consume a chunk and return the top-level fields it completed"""
+        self.buffer += chunk
+        completed = {}
+        buffer = self.buffer
+        while self._pos < len(buffer) and not self.done:
+            if self._depth == 0:
+                # Skip any preamble, brackets included, up to the object's opening brace
+                start = buffer.find("{", self._pos)
+                if start < 0:
+                    self._pos = len(buffer)
+                    break
+                self._pos = start
+            char = buffer[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._member_start = self._pos + 1
+            elif char in "}]":
+                if self._depth == 1:
+                    self._complete_member(self._member_start, self._pos, completed)
+                    self.done = True
+                self._depth -= 1
+            elif char == "," and self._depth == 1:
+                self._complete_member(self._member_start, self._pos, completed)
+                self._member_start = self._pos + 1
+            self._pos += 1
+        return completed
+
+    def _complete_member(self, start: int, end: int, completed: Dict) -> None:
+        member = self.buffer[start:end].strip()
+        if not member:
+            return
+        try:
+            field = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return
+        self.fields.update(field)
+        completed.update(field)
+
+
+def find_first_object(text: str):
+    """Return (start, end) of the first balanced top-level JSON object in text, or None.
+
+    A single linear, string-aware scan; unlike a greedy regex it never backtracks
+    and stops at the first complete object even if more braces follow.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_string = False
+    escape = False
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return start, pos + 1
+    return None
+
+
+def repair_truncated_json(text: str):
+    """Close a JSON object that was cut off mid-stream (e.g. when max_tokens was hit).
+
+    Everything after the last complete value is dropped and the open arrays and
+    objects are closed, so '{"a": 1, "b": ["x", "y' becomes '{"a": 1, "b": ["x"]}'.
+    Returns None if text contains no "{".
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    # Each frame is [opening char, whether we are past the ":" of an object member]
+    stack = []
+    in_string = False
+    escape = False
+    safe_end = start + 1
+    safe_closers = "}"
+
+    def closers():
+        return "".join("}" if frame[0] == "{" else "]" for frame in reversed(stack))
+
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+                frame = stack[-1]
+                # A finished string is a complete value in arrays or after a member's ":"
+                if frame[0] == "[" or frame[1]:
+                    safe_end, safe_closers = pos + 1, closers()
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append([char, False])
+        elif char in "}]":
+            stack.pop()
+            if not stack:
+                return text[start:pos + 1]
+            safe_end, safe_closers = pos + 1, closers()
+        elif char == ":":
+            stack[-1][1] = True
+        elif char == ",":
+            # Whatever preceded the comma is complete
+            safe_end, safe_closers = pos, closers()
+            stack[-1][1] = False
+
+    return text[start:safe_end] + safe_closers
+
+
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+def extract_json_object(text: str):
+    """Return (obj, repaired) for the first JSON object in text; obj is None if nothing parses"""
+    if not text:
+        return None, False
+    bounds = find_first_object(text)
+    if bounds is not None:
+        try:
+            obj = json.loads(text[bounds[0]:bounds[1]])
+            if isinstance(obj, dict):
+                return obj, False
+        except json.JSONDecodeError:
+            pass
+        # Balanced but invalid (e.g. a trailing comma): fall through to the repair pass
+        candidate = repair_truncated_json(text[bounds[0]:bounds[1] - 1])
+    else:
+        candidate = repair_truncated_json(text)
+    if candidate is None:
+        return None, False
+    # Models occasionally emit trailing commas; drop them before the final parse
+    candidate = _TRAILING_COMMA_RE.sub(r"\1", candidate)
+    try:
+        obj = json.loads(candidate)
+    except json.JSONDecodeError:
+        return None, False
+    return (obj, True) if isinstance(obj, dict) and obj else (None, False)
+
+
+_INT_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _coerce_int(value, low: int, high: int):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = value
+    elif isinstance(value, str):
+        # Accept "72", "72/100" or "Score: 72"
+        match = _INT_RE.search(value)
+        if match is None:
+            return None
+        number = float(match.group())
+    else:
+        return None
+    return max(low, min(high, int(round(number))))
+
+
+def coerce_to_schema(data: Dict, schema: Dict):
+    """Validate and coerce data against schema; return (clean, missing_fields).
+
+    Schema values are (int, low, high) for bounded integers, str, list (of strings)
+    or a nested dict of bounded integers. A nested dict with any missing key is
+    reported as missing as a whole.
+    """
+    clean = {}
+    missing = []
+    for field, spec in schema.items():
+        value = data.get(field)
+        if isinstance(spec, dict):
+            if not isinstance(value, dict):
+                missing.append(field)
+                continue
+            nested, nested_missing = coerce_to_schema(value, spec)
+            if nested_missing:
+                missing.append(field)
+            else:
+                clean[field] = nested
+        elif isinstance(spec, tuple):
+            number = _coerce_int(value, spec[1], spec[2]) if value is not None else None
+            if number is None:
+                missing.append(field)
+            else:
+                clean[field] = number
+        elif spec is list:
+            if isinstance(value, list):
+                clean[field] = [item if isinstance(item, str) else json.dumps(item) for item in value if item]
+            elif isinstance(value, str) and value.strip():
+                clean[field] = [value.strip()]
+            else:
+                missing.append(field)
+        elif spec is str:
+            if isinstance(value, str):
+                clean[field] = value.strip()
+            elif value is not None:
+                clean[field] = json.dumps(value)
+            else:
+                missing.append(field)
+    return clean, missing
@@ -0,0 +1,128 @@
+import re
+from typing import Dict, List
+
+# Keyword lexicon grouped by domain, most in-demand first within each group
+KEYWORD_LEXICON = {
+    "software": ["python", "java", "javascript", "typescript", "sql", "git", "rest api", "c++", "c#", "golang",
+                 "react", "node.js", "django", "flask", "spring", "microservices", "unit testing"],
+    "cloud_devops": ["aws", "azure", "gcp", "docker", "kubernetes", "ci/cd", "terraform", "linux", "jenkins",
+                     "ansible", "monitoring"],
+    "data": ["machine learning", "pandas", "numpy", "tensorflow", "pytorch", "scikit-learn", "spark",
+             "tableau", "power bi", "data analysis", "statistics", "etl", "deep learning", "nlp"],
+    "business": ["stakeholder management", "project management", "agile", "scrum", "budgeting", "forecasting",
+                 "strategy", "kpi", "crm", "salesforce", "excel", "negotiation"],
+    "soft_skills": ["leadership", "communication", "collaboration", "problem solving", "mentoring",
+                    "teamwork", "time management"]
+}
+
+ACTION_VERBS = {
+    "achieved", "architected", "automated", "built", "created", "decreased", "delivered", "designed",
+    "developed", "drove", "engineered", "established", "implemented", "improved", "increased", "launched",
+    "led", "managed", "mentored", "migrated", "optimized", "owned", "reduced", "resolved", "scaled",
+    "shipped", "spearheaded", "streamlined"
+}
+
+SECTION_LABELS = {
+    "contact_info": "Contact information",
+    "summary": "Professional summary",
+    "experience": "Work experience",
+    "education": "Education",
+    "skills": "Skills",
+    "certifications": "Certifications",
+    "projects": "Projects"
+}
+
+_KEYWORD_RE = re.compile(
+    r"(?<![\w+#.])(" + "|".join(
+        re.escape(keyword) for keyword in sorted(
+            {k for keywords in KEYWORD_LEXICON.values() for k in keywords}, key=len, reverse=True
+        )
+    ) + r")(?![\w+#])",
+    re.IGNORECASE
+)
+_WORD_RE = re.compile(r"[a-z]+")
+# Numbers, percentages and money amounts signal quantified achievements; 19xx/20xx years are dates, not results
+_METRIC_RE = re.compile(r"\d+(?:\.\d+)?\s*%|[$€£₹]\s*\d|\b(?!(?:19|20)\d{2}\b)\d{2,}\b")
+
+_KEYWORD_DOMAIN = {k: domain for domain, keywords in KEYWORD_LEXICON.items() for k in keywords}
+
+
+def find_keywords(text: str) -> List[str]:
+    """Return lexicon keywords present in text, in order of first appearance"""
+    found = []
+    seen = set()
+    for match in _KEYWORD_RE.finditer(text):
+        keyword = match.group(1).lower()
+        if keyword not in seen:
+            seen.add(keyword)
+            found.append(keyword)
+    return found
+
+
+def analyze_resume_locally(resume_data: Dict[str, str], rule_based_score: int, rule_based_breakdown: Dict,
+                           suggestions: List[str], score_weights: Dict[str, int], max_items: int = 5) -> Dict:
+    """Deterministic analysis in the same JSON shape as the AI analysis, with no LLM call"""
+    full_text = resume_data.get("full_text") or "\n".join(v for k, v in resume_data.items() if v)
+    experience = resume_data.get("experience", "")
+
+    keywords_found = find_keywords(full_text)
+    words = _WORD_RE.findall(experience.lower())
+    action_verbs = sorted(ACTION_VERBS.intersection(words))
+    metrics = len(_METRIC_RE.findall(experience))
+
+    strengths = []
+    weaknesses = []
+    for category, max_points in score_weights.items():
+        points = rule_based_breakdown.get(category, 0)
+        label = SECTION_LABELS.get(category, category.replace("_", " ").capitalize())
+        if points >= max_points:
+            strengths.append(f"{label} is complete ({points}/{max_points})")
+        elif points <= max_points // 3:
+            weaknesses.append(f"{label} is weak or missing ({points}/{max_points})")
+    if len(action_verbs) >= 3:
+        strengths.append(f"Uses strong action verbs ({', '.join(action_verbs[:4])})")
+    elif experience:
+        weaknesses.append("Few strong action verbs in experience descriptions")
+    if metrics >= 3:
+        strengths.append(f"Experience includes {metrics} quantified results")
+    elif experience:
+        weaknesses.append("Experience lacks quantified achievements (numbers, percentages, amounts)")
+
+    missing_sections = [label for section, label in SECTION_LABELS.items() if not resume_data.get(section)]
+
+    # Suggest the most in-demand keywords from the domains the resume already targets
+    domain_hits = {}
+    for keyword in keywords_found:
+        domain = _KEYWORD_DOMAIN[keyword]
+        domain_hits[domain] = domain_hits.get(domain, 0) + 1
+    keywords_missing = []
+    for domain, _ in sorted(domain_hits.items(), key=lambda item: item[1], reverse=True):
+        for keyword in KEYWORD_LEXICON[domain]:
+            if keyword not in keywords_found and len(keywords_missing) < max_items:
+                keywords_missing.append(keyword)
+
+    recommendations = []
+    if keywords_missing:
+        recommendations.append(f"Add relevant keywords you can back up, such as {', '.join(keywords_missing[:3])}")
+    if experience and metrics < 3:
+        recommendations.append("Quantify achievements with numbers, percentages or amounts")
+    recommendations.extend(suggestions)
+
+    if rule_based_score >= 80:
+        verdict = "Well-structured resume that covers the sections ATS systems look for."
+    elif rule_based_score >= 60:
+        verdict = "Reasonably complete resume with some gaps in content depth."
+    else:
+        verdict = "Resume is missing key sections or detail that ATS systems look for."
+
+    return {
+        "ats_score": rule_based_score,
+        "score_breakdown": dict(rule_based_breakdown),
+        "strengths": strengths[:max_items],
+        "weaknesses": weaknesses[:max_items],
+        "missing_sections": missing_sections,
+        "recommendations": recommendations[:max_items],
+        "keywords_found": keywords_found,
+        "keywords_missing": keywords_missing,
+        "overall_impression": f"{verdict} (Fast local analysis; no AI review.)"
+    }
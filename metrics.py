@@ -0,0 +1,164 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
+
+# Recent samples kept per stage for percentile estimates
+SAMPLE_WINDOW = 2048
+
+
+class _StageStats:
+    __slots__ = ("count", "total", "max", "errors", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+
+class PipelineMetrics:
+    """Thread-safe per-stage timings and counters for the analysis pipeline"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _StageStats] = {}
+        self._counters: Dict[str, float] = {}
+
+    def observe(self, stage: str, seconds: float, error: bool = False) -> None:
+        """Record one timed run of a stage"""
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _StageStats()
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.samples.append(seconds)
+            if error:
+                stats.errors += 1
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add value to a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    @contextmanager
+    def span(self, stage: str):
+        """Time the enclosed block as one run of stage"""
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, error)
+
+    def timed(self, stage: str):
+        """Decorator form of span() for plain and async functions"""
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(stage):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict:
+        """Return a structured copy of every stage timing and counter"""
+        with self._lock:
+            stages = {}
+            for name, stats in self._stages.items():
+                ordered = sorted(stats.samples)
+                stages[name] = {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "total_seconds": round(stats.total, 6),
+                    "mean_seconds": round(stats.total / stats.count, 6) if stats.count else 0.0,
+                    "max_seconds": round(stats.max, 6),
+                    "p50_seconds": round(_percentile(ordered, 0.50), 6),
+                    "p95_seconds": round(_percentile(ordered, 0.95), 6),
+                    "p99_seconds": round(_percentile(ordered, 0.99), 6)
+                }
+            return {"stages": stages, "counters": dict(self._counters)}
+
+    def export(self) -> Dict:
+        """Raw counters and per-stage samples, for merge() into another process's registry"""
+        with self._lock:
+            stages = {
+                name: {"count": stats.count, "total": stats.total, "max": stats.max, "errors": stats.errors,
+                       "samples": [round(sample, 6) for sample in stats.samples]}
+                for name, stats in self._stages.items()
+            }
+            return {"stages": stages, "counters": dict(self._counters)}
+
+    def merge(self, exported: Dict) -> None:
+        """Add another registry's export() to this one, e.g. to aggregate worker processes"""
+        with self._lock:
+            for name, other in exported.get("stages", {}).items():
+                stats = self._stages.get(name)
+                if stats is None:
+                    stats = self._stages[name] = _StageStats()
+                stats.count += other["count"]
+                stats.total += other["total"]
+                stats.max = max(stats.max, other["max"])
+                stats.errors += other["errors"]
+                stats.samples.extend(other["samples"])
+            for name, value in exported.get("counters", {}).items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def to_prometheus(self, prefix: str = "resume_analyzer") -> str:
+        """Render the metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, stats in sorted(snapshot["stages"].items()):
+            for quantile in ("0.5", "0.95", "0.99"):
+                key = {"0.5": "p50_seconds", "0.95": "p95_seconds", "0.99": "p99_seconds"}[quantile]
+                lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {stats[key]}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {stats["total_seconds"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        lines.append(f"# TYPE {prefix}_stage_errors_total counter")
+        for stage, stats in sorted(snapshot["stages"].items()):
+            lines.append(f'{prefix}_stage_errors_total{{stage="{stage}"}} {stats["errors"]}')
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_jsonl(self, path: str) -> None:
+        """Append a timestamped snapshot as one JSON line"""
+        record = {"timestamp": time.time(), **self.snapshot()}
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Process-wide registry used by the parser, the analyzer, the batch CLI and the app
+metrics = PipelineMetrics()
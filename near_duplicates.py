@@ -0,0 +1,174 @@
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from metrics import metrics
+from storage import cache_path, connect
+
+DEFAULT_INDEX_PATH = cache_path('near_duplicates.sqlite3')
+
+NUM_PERM = 128
+# 16 bands of 8 rows: pairs above ~0.7 Jaccard similarity almost always share a bucket
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+
+# Universal hashing modulo the largest 32-bit prime keeps every product inside uint64
+_PRIME = np.uint64(4294967291)
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(1, 2 ** 32 - 5, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 2 ** 32 - 5, size=NUM_PERM, dtype=np.uint64)
+
+_TOKEN_RE = re.compile(r"[a-z]+|\d+")
+
+
+def shingles(text: str) -> np.ndarray:
+    """Stable 32-bit hashes of the word 3-grams of text.
+
+    Numbers collapse to "0" so a changed date or phone number does not make an
+    otherwise identical resume look different.
+    """
+    tokens = ["0" if token[0].isdigit() else token for token in _TOKEN_RE.findall(text.lower())]
+    if len(tokens) < SHINGLE_WORDS:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = {" ".join(tokens[i:i + SHINGLE_WORDS]) for i in range(len(tokens) - SHINGLE_WORDS + 1)}
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint32 values) of the shingles of text"""
+    hashes = shingles(text)
+    if hashes.size == 0:
+        return np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+    permuted = (np.outer(hashes, _A) + _B) % _PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the documents behind two signatures"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def resume_text(resume_data: Dict[str, str]) -> str:
+    """The text a resume is fingerprinted by"""
+    if resume_data.get("full_text"):
+        return resume_data["full_text"]
+    return "\n".join(value for key, value in sorted(resume_data.items()) if isinstance(value, str))
+
+
+class NearDuplicateIndex:
+    """Persisted MinHash/LSH index from resume text to the id of an earlier, similar resume.
+
+    Signatures live in SQLite and are loaded into in-memory LSH buckets, so
+    lookups are a handful of dict probes plus one signature comparison per
+    candidate, and new resumes can be added one at a time. Each query first
+    loads rows other processes (queue workers, batch runs) have added since. Every entry has a
+    scope (e.g. the model and prompt version it was analysed with) and only
+    matches queries for the same scope.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, threshold: float = 0.9):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._scopes: Dict[str, str] = {}
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(BANDS)]
+        self._last_rowid = 0
+        self._conn = connect(path)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS signatures (
+                doc_id TEXT PRIMARY KEY,
+                signature BLOB NOT NULL,
+                scope TEXT NOT NULL DEFAULT '',
+                added_at REAL NOT NULL
+            )"""
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(signatures)")}
+        if "scope" not in columns:
+            # Indexes written before scopes existed: their entries keep the empty scope and never match again
+            self._conn.execute("ALTER TABLE signatures ADD COLUMN scope TEXT NOT NULL DEFAULT ''")
+        self._conn.commit()
+        self._load_new()
+
+    def _load_new(self) -> None:
+        """Index rows added since the last call, by this or any other process; call with the lock held"""
+        rows = self._conn.execute(
+            "SELECT rowid, doc_id, signature, scope FROM signatures WHERE rowid > ? ORDER BY rowid",
+            (self._last_rowid,)
+        ).fetchall()
+        for rowid, doc_id, blob, scope in rows:
+            if doc_id not in self._signatures:
+                self._insert(doc_id, np.frombuffer(blob, dtype=np.uint32), scope)
+            self._last_rowid = rowid
+
+    def _insert(self, doc_id: str, signature: np.ndarray, scope: str) -> None:
+        self._signatures[doc_id] = signature
+        self._scopes[doc_id] = scope
+        for band, buckets in enumerate(self._buckets):
+            buckets.setdefault(signature[band * ROWS:(band + 1) * ROWS].tobytes(), []).append(doc_id)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._signatures
+
+    def query(self, text: str = None, signature: np.ndarray = None, scope: str = "") -> Optional[Tuple[str, float]]:
+        """Return (doc_id, similarity) of the most similar resume in scope at or above threshold, or None"""
+        if signature is None:
+            signature = minhash(text)
+        best = None
+        with self._lock:
+            self._load_new()
+            seen = set()
+            for band, buckets in enumerate(self._buckets):
+                for doc_id in buckets.get(signature[band * ROWS:(band + 1) * ROWS].tobytes(), ()):
+                    if doc_id in seen or self._scopes[doc_id] != scope:
+                        continue
+                    seen.add(doc_id)
+                    score = similarity(signature, self._signatures[doc_id])
+                    if score >= self.threshold and (best is None or score > best[1]):
+                        best = (doc_id, score)
+        metrics.increment("near_duplicate_hits" if best is not None else "near_duplicate_misses")
+        return best
+
+    def add(self, doc_id: str, text: str = None, signature: np.ndarray = None, scope: str = "") -> None:
+        """Index a resume under doc_id within scope; adding an id twice is a no-op"""
+        if signature is None:
+            signature = minhash(text)
+        with self._lock:
+            if doc_id in self._signatures:
+                return
+            self._insert(doc_id, signature, scope)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO signatures (doc_id, signature, scope, added_at) VALUES (?, ?, ?, ?)",
+                (doc_id, signature.astype(np.uint32).tobytes(), scope, time.time())
+            )
+            self._conn.commit()
+
+    def remove(self, doc_id: str) -> None:
+        """Drop doc_id, e.g. when its analysis has been evicted from the cache"""
+        with self._lock:
+            signature = self._signatures.pop(doc_id, None)
+            if signature is None:
+                return
+            del self._scopes[doc_id]
+            for band, buckets in enumerate(self._buckets):
+                key = signature[band * ROWS:(band + 1) * ROWS].tobytes()
+                members = buckets.get(key, [])
+                if doc_id in members:
+                    members.remove(doc_id)
+                if not members:
+                    buckets.pop(key, None)
+            self._conn.execute("DELETE FROM signatures WHERE doc_id = ?", (doc_id,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
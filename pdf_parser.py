@@ -1,71 +1,531 @@
-import pdfplumber
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
 import re
-from typing import Dict
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+from metrics import metrics
 
-def extract_text_from_pdf(pdf_file) -> str:
-    """Extract all text from PDF file"""
-    text = ""
+# Guards against oversized uploads; override with PDF_MAX_PAGES / PDF_MAX_BYTES / PDF_MAX_CHARS
+MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(20 * 1024 * 1024)))
+MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "500000"))
+
+# Caps for extract_resume_data_isolated; PDF_SANDBOX=0 makes the job workers extract in-process
+PDF_SANDBOX = os.getenv("PDF_SANDBOX", "1") != "0"
+SANDBOX_MAX_MEMORY = int(os.getenv("PDF_MAX_MEMORY_MB", "1024")) * 1024 * 1024
+SANDBOX_TIMEOUT = float(os.getenv("PDF_TIMEOUT", "60"))
+
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+# Process-pool size for page-range extraction of large PDFs (0 disables it)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "0"))
+
+# Text backend tried first: "pdfium" (fastest), "pdfminer" (line grouping only) or "pdfplumber" (layout
+# analysis, slowest). Output that fails the quality check below is re-extracted with pdfplumber.
+PDF_BACKEND = os.getenv("PDF_BACKEND", "pdfium")
+# Fall back when more than this share of pages has no text ...
+MAX_EMPTY_PAGE_RATIO = 0.5
+# ... or more than this share of characters is replacement, private-use or control characters
+MAX_GARBLED_RATIO = 0.05
+# ... or when lines average more than this many characters, i.e. line breaks were lost
+MAX_MEAN_LINE_LENGTH = 300
+
+# Bump whenever extraction or section parsing changes so stored parses are refreshed
+PARSER_VERSION = "2"
+
+# Documents with fewer pages than this are never worth the process-pool overhead
+PARALLEL_MIN_PAGES = 8
+
+_process_pool = None
+_process_pool_workers = 0
+
+
+class PDFTooLargeError(ValueError):
+    """Raised when a PDF exceeds the configured page, byte or character limit"""
+
+
+class PDFExtractionError(ValueError):
+    """Raised when sandboxed extraction fails, hits its memory cap or times out"""
+
+
+def _pdf_size(pdf_file) -> int:
+    """Return the size in bytes of a path or seekable file object"""
+    if isinstance(pdf_file, (str, os.PathLike)):
+        return os.path.getsize(pdf_file)
+    if isinstance(pdf_file, (bytes, bytearray)):
+        return len(pdf_file)
+    position = pdf_file.tell()
+    pdf_file.seek(0, io.SEEK_END)
+    size = pdf_file.tell()
+    pdf_file.seek(position)
+    return size
+
+
+def _check_limits(pdf_file, page_count: int = None, max_pages: int = MAX_PAGES, max_bytes: int = MAX_BYTES) -> None:
+    if page_count is None:
+        size = _pdf_size(pdf_file)
+        if max_bytes and size > max_bytes:
+            raise PDFTooLargeError(f"PDF is {size} bytes; the limit is {max_bytes} bytes")
+    elif max_pages and page_count > max_pages:
+        raise PDFTooLargeError(f"PDF has {page_count} pages; the limit is {max_pages} pages")
+
+
+def _pdfplumber_pages(pdf_file, max_pages: int = MAX_PAGES) -> Iterator[str]:
+    """Layout-aware extraction; the reference backend and the fallback for the others"""
+    # pdfplumber pulls in pdfminer; import it on first use so importing this module stays cheap
+    import pdfplumber
     with pdfplumber.open(pdf_file) as pdf:
+        _check_limits(pdf_file, len(pdf.pages), max_pages=max_pages)
         for page in pdf.pages:
-            text += page.extract_text() + "\n"
-    return text
+            # extract_text() returns None for pages without a text layer (e.g. scans)
+            yield page.extract_text() or ""
+            # Drop the parsed layout objects so memory stays flat on long documents
+            page.flush_cache()
+
+
+def _pdfium_pages(pdf_file, max_pages: int = MAX_PAGES) -> Iterator[str]:
+    """Plain text in content order from PDFium, without any layout analysis"""
+    import pypdfium2
+    pdf = pypdfium2.PdfDocument(bytes(pdf_file) if isinstance(pdf_file, bytearray) else pdf_file)
+    try:
+        _check_limits(pdf_file, len(pdf), max_pages=max_pages)
+        for index in range(len(pdf)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                text = textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+            yield text.replace("\r\n", "\n").replace("\r", "\n")
+    finally:
+        pdf.close()
+
+
+def _pdfminer_pages(pdf_file, max_pages: int = MAX_PAGES) -> Iterator[str]:
+    """pdfminer's text converter with its default line grouping but no figure or column analysis"""
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+    output = io.StringIO()
+    manager = PDFResourceManager()
+    # Without LAParams pdfminer emits no line breaks at all, which text_quality_issue() rejects as
+    # "unbroken"; grouping characters into lines is cheap next to pdfplumber's word-level layout
+    device = TextConverter(manager, output, laparams=LAParams(all_texts=False, detect_vertical=False))
+    interpreter = PDFPageInterpreter(manager, device)
+    try:
+        with _open_binary(pdf_file) as fp:
+            for count, page in enumerate(PDFPage.get_pages(fp), 1):
+                # pdfminer discovers pages lazily, so the page limit is enforced while iterating
+                if max_pages and count > max_pages:
+                    raise PDFTooLargeError(f"PDF has more than {max_pages} pages; the limit is {max_pages} pages")
+                interpreter.process_page(page)
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+    finally:
+        device.close()
+
+
+def _open_binary(pdf_file):
+    if isinstance(pdf_file, (str, os.PathLike)):
+        return open(pdf_file, "rb")
+    if isinstance(pdf_file, (bytes, bytearray)):
+        return io.BytesIO(pdf_file)
+    pdf_file.seek(0)
+    return contextlib.nullcontext(pdf_file)
+
+
+# Name -> function(pdf_file, max_pages) yielding the text of each page
+EXTRACTION_BACKENDS: Dict[str, Callable[..., Iterator[str]]] = {
+    "pdfium": _pdfium_pages,
+    "pdfminer": _pdfminer_pages,
+    "pdfplumber": _pdfplumber_pages
+}
+
+_GARBLED_RE = re.compile(r"[\ufffd\ue000-\uf8ff\x00-\x08\x0b\x0c\x0e-\x1f]|\(cid:\d+\)")
+
+
+def text_quality_issue(pages: List[str]) -> Optional[str]:
+    """Why extracted pages look unusable ("empty", "garbled" or "unbroken"), or None if they look fine"""
+    if not pages:
+        return "empty"
+    empty = sum(1 for page in pages if not page.strip())
+    if empty / len(pages) > MAX_EMPTY_PAGE_RATIO:
+        return "empty"
+    chars = sum(len(page) for page in pages)
+    garbled = sum(len(match) for page in pages for match in _GARBLED_RE.findall(page))
+    if chars and garbled / chars > MAX_GARBLED_RATIO:
+        return "garbled"
+    lines = sum(page.count("\n") + 1 for page in pages if page.strip())
+    if chars / lines > MAX_MEAN_LINE_LENGTH:
+        # Section parsing works line by line, so text without line breaks is useless to it
+        return "unbroken"
+    return None
+
+
+def _get_backend(name: str) -> Callable[..., Iterator[str]]:
+    try:
+        return EXTRACTION_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"unknown PDF backend {name!r}; expected one of {', '.join(EXTRACTION_BACKENDS)}") from None
+
+
+def _extract_page_range(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Worker: extract text for pages [start, stop) of an in-memory PDF"""
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        texts = []
+        for page in pdf.pages[start:stop]:
+            texts.append(page.extract_text() or "")
+            page.flush_cache()
+        return texts
+
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Reuse one process pool across calls so worker start-up is paid once"""
+    global _process_pool, _process_pool_workers
+    if _process_pool is None or _process_pool_workers != workers:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False)
+        _process_pool = ProcessPoolExecutor(max_workers=workers)
+        _process_pool_workers = workers
+    return _process_pool
+
+
+def _read_bytes(pdf_file) -> bytes:
+    if isinstance(pdf_file, (str, os.PathLike)):
+        with open(pdf_file, "rb") as f:
+            return f.read()
+    if isinstance(pdf_file, (bytes, bytearray)):
+        return bytes(pdf_file)
+    pdf_file.seek(0)
+    return pdf_file.read()
+
+
+def _extract_parallel(pdf_file, page_count: int, workers: int) -> List[str]:
+    """Split the document into contiguous page ranges and extract them in a process pool"""
+    pdf_bytes = _read_bytes(pdf_file)
+    chunk = -(-page_count // workers)
+    ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+    pool = _get_process_pool(workers)
+    futures = [pool.submit(_extract_page_range, pdf_bytes, start, stop) for start, stop in ranges]
+    pages = []
+    for future in futures:
+        pages.extend(future.result())
+    return pages
 
-def parse_resume_sections(text: str) -> Dict[str, str]:
-    """Parse resume text into sections"""
-    sections = {
-        "contact_info": "",
-        "summary": "",
-        "experience": "",
-        "education": "",
-        "skills": "",
-        "certifications": "",
-        "projects": "",
-        "other": ""
-    }
-
-    # Common section headers patterns
-    section_patterns = {
-        "contact_info": r"(contact|personal information|personal details)",
-        "summary": r"(summary|profile|objective|about|professional summary)",
-        "experience": r"(experience|work experience|employment|work history|professional experience)",
-        "education": r"(education|academic|qualification)",
-        "skills": r"(skills|technical skills|core competencies|expertise)",
-        "certifications": r"(certification|certificates|licenses)",
-        "projects": r"(projects|personal projects|academic projects)"
-    }
-
-    # Split text into lines
-    lines = text.split('\n')
-    current_section = "other"
-    section_content = {key: [] for key in sections.keys()}
 
-    # Extract contact info from top (first 5 lines typically)
-    section_content["contact_info"] = lines[:5]
+def _limit_chars(pages: Iterator[str], max_chars: int = MAX_CHARS) -> Iterator[str]:
+    """Pass page texts through, stopping as soon as the character limit is exceeded"""
+    chars = 0
+    for page in pages:
+        chars += len(page) + 1
+        if max_chars and chars > max_chars:
+            raise PDFTooLargeError(f"PDF has more than {max_chars} characters of text; the limit is {max_chars}")
+        yield page
 
-    for line in lines:
-        line_lower = line.lower().strip()
 
-        # Check if line matches any section header
-        matched = False
-        for section, pattern in section_patterns.items():
-            if re.search(pattern, line_lower, re.IGNORECASE):
-                current_section = section
-                matched = True
-                break
+def _pdfplumber_text(pdf_file, max_pages: int, workers: int, max_chars: int) -> Iterator[str]:
+    """pdfplumber extraction, split over a process pool for long documents when workers > 1"""
+    if workers and workers > 1:
+        import pdfplumber
+        with pdfplumber.open(pdf_file) as pdf:
+            page_count = len(pdf.pages)
+        _check_limits(pdf_file, page_count, max_pages=max_pages)
+        if page_count >= PARALLEL_MIN_PAGES:
+            yield from _limit_chars(_extract_parallel(pdf_file, page_count, workers), max_chars)
+            return
+        if hasattr(pdf_file, "seek"):
+            pdf_file.seek(0)
+    yield from _limit_chars(_pdfplumber_pages(pdf_file, max_pages), max_chars)
 
-        # Add content to current section if not a header
-        if not matched and line.strip():
-            section_content[current_section].append(line)
 
-    # Convert lists to strings
-    for key in sections.keys():
-        sections[key] = '\n'.join(section_content[key]).strip()
+def iter_pdf_pages(pdf_file, max_pages: int = MAX_PAGES, max_bytes: int = MAX_BYTES, workers: int = PDF_WORKERS,
+                   backend: str = PDF_BACKEND, max_chars: int = MAX_CHARS) -> Iterator[str]:
+    """Yield the text of each page, with the limits and quality fallback of extract_text_from_pdf.
 
+    The fast backend's pages are collected first so text_quality_issue() can judge
+    the whole document; pdfplumber pages, the slow and memory-hungry ones, are
+    yielded one at a time as they are extracted.
+    """
+    _check_limits(pdf_file, max_bytes=max_bytes)
+    extract = _get_backend(backend)
+    if backend != "pdfplumber":
+        try:
+            with metrics.span(f"pdf_backend_{backend}"):
+                pages = list(_limit_chars(extract(pdf_file, max_pages), max_chars))
+            reason = text_quality_issue(pages)
+        except PDFTooLargeError:
+            raise
+        except Exception:
+            # Malformed for this backend; pdfplumber either copes or raises its own error
+            reason = "error"
+        if reason is None:
+            metrics.increment(f"pdf_backend_{backend}")
+            for page in pages:
+                yield _count_page(page)
+            return
+        metrics.increment("pdf_backend_fallbacks")
+        metrics.increment(f"pdf_backend_fallback_{reason}")
+        if hasattr(pdf_file, "seek"):
+            pdf_file.seek(0)
+
+    metrics.increment("pdf_backend_pdfplumber")
+    # Not a span: a caller that stops iterating early is not an extraction error
+    start = time.perf_counter()
+    try:
+        for page in _pdfplumber_text(pdf_file, max_pages, workers, max_chars):
+            yield _count_page(page)
+    except Exception:
+        metrics.observe("pdf_backend_pdfplumber", time.perf_counter() - start, error=True)
+        raise
+    metrics.observe("pdf_backend_pdfplumber", time.perf_counter() - start)
+
+
+def _count_page(page: str) -> str:
+    metrics.increment("pdf_pages")
+    metrics.increment("pdf_chars", len(page) + 1)
+    return page
+
+
+@metrics.timed("extract_text_from_pdf")
+def extract_text_from_pdf(pdf_file, max_pages: int = MAX_PAGES, max_bytes: int = MAX_BYTES,
+                          workers: int = PDF_WORKERS, backend: str = PDF_BACKEND, max_chars: int = MAX_CHARS) -> str:
+    """Extract all text from PDF file.
+
+    The fast backend's output is used unless text_quality_issue() rejects it, in
+    which case the document is re-extracted with pdfplumber. With workers > 1,
+    pdfplumber splits documents of PARALLEL_MIN_PAGES pages or more into page
+    ranges that are extracted in a process pool. See iter_pdf_pages() for the
+    page-by-page version.
+    """
+    return "".join(page + "\n" for page in iter_pdf_pages(pdf_file, max_pages, max_bytes, workers, backend,
+                                                          max_chars))
+
+# Header phrases per section; matched against whole header-like lines only
+SECTION_HEADERS = {
+    "contact_info": ["contact", "contact information", "contact details", "contact info",
+                     "personal information", "personal details"],
+    "summary": ["summary", "professional summary", "career summary", "profile", "professional profile",
+                "objective", "career objective", "about", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "relevant experience",
+                   "employment", "employment history", "work history", "career history"],
+    "education": ["education", "academic background", "academics", "academic qualifications",
+                  "qualifications", "qualification"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "competencies", "expertise",
+               "areas of expertise"],
+    "certifications": ["certifications", "certification", "certificates", "licenses",
+                       "licenses and certifications", "licenses & certifications"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects", "selected projects"]
+}
+
+# Longest header lines we consider; body lines are almost always longer
+MAX_HEADER_LENGTH = 50
+
+
+def _compile_header_pattern() -> "re.Pattern":
+    """Combine every header phrase into one anchored alternation with a named group per section"""
+    groups = []
+    for section, phrases in SECTION_HEADERS.items():
+        alternatives = sorted(phrases, key=len, reverse=True)
+        body = "|".join(r"\s+".join(re.escape(word) for word in phrase.split()) for phrase in alternatives)
+        groups.append(f"(?P<{section}>{body})")
+    # Allow a trailing "& Tools"/"and Training" qualifier, e.g. "Skills & Tools"
+    return re.compile(r"(?:" + "|".join(groups) + r")(?:\s*(?:&|and)\s+\w+(?:\s+\w+)?)?")
+
+
+_HEADER_RE = _compile_header_pattern()
+# Leading bullets/numbering and trailing colons or rules around a header
+_HEADER_TRIM_RE = re.compile(r"^[\W\d_]+|[\s:\-\u2013\u2014_=*#|]+$")
+
+
+def classify_header(line: str):
+    """Return (section, inline_content) when the line is a section header, else None.
+
+    A header is a short line that consists solely of a known heading, optionally
+    decorated with bullets or a trailing colon. "Skills: Python, SQL" is also a
+    header and returns the text after the colon as inline content.
+    """
+    stripped = line.strip()
+    if not stripped or len(stripped) > MAX_HEADER_LENGTH * 4:
+        return None
+
+    inline = ""
+    candidate = stripped
+    if len(stripped) > MAX_HEADER_LENGTH or ":" in stripped:
+        head, sep, rest = stripped.partition(":")
+        # Inline headers must look like headings ("Skills:", "SKILLS:"), not prose
+        if not sep or len(head) > MAX_HEADER_LENGTH or not head[:1].isupper():
+            return None
+        candidate, inline = head, rest.strip()
+    elif stripped.endswith("."):
+        # Sentences are body text, not headings
+        return None
+
+    match = _HEADER_RE.fullmatch(_HEADER_TRIM_RE.sub("", candidate).lower())
+    if match is None:
+        return None
+    return match.lastgroup, inline
+
+
+@metrics.timed("parse_resume_sections")
+def parse_resume_sections(text: str) -> Dict[str, str]:
+    """Parse resume text into sections"""
+    # One buffer per section, written line by line, so neither a list of every
+    # line nor per-section lists of lines are ever held next to the text.
+    # Every line is written as "\n" + line; the final strip() removes the leading one.
+    buffers = {section: io.StringIO() for section in
+               ("contact_info", "summary", "experience", "education", "skills", "certifications", "projects", "other")}
+    # Contact info starts with the top of the resume (first 5 lines typically)
+    top = io.StringIO()
+
+    current_section = "other"
+    # Single pass: each line is classified by at most one precompiled match
+    for number, line in enumerate(_iter_lines(text)):
+        if number < 5:
+            top.write("\n" + line)
+        header = classify_header(line)
+        if header is not None:
+            current_section, inline = header
+            if inline:
+                buffers[current_section].write("\n" + inline)
+        elif line.strip():
+            buffers[current_section].write("\n" + line)
+
+    sections = {"contact_info": (top.getvalue() + buffers.pop("contact_info").getvalue()).strip()}
+    sections.update((section, buffer.getvalue().strip()) for section, buffer in buffers.items())
     return sections
 
-def extract_resume_data(pdf_file) -> Dict[str, str]:
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """The lines of text, like text.split("\\n") but without building the list"""
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def extract_resume_data(pdf_file, workers: int = PDF_WORKERS) -> Dict[str, str]:
     """Main function to extract and parse resume"""
-    text = extract_text_from_pdf(pdf_file)
+    text = extract_text_from_pdf(pdf_file, workers=workers)
     sections = parse_resume_sections(text)
     sections["full_text"] = text
     return sections
+
+
+@contextlib.contextmanager
+def spool_to_file(pdf_file) -> Iterator[str]:
+    """Yield a filesystem path for a PDF given as a path, bytes or file-like object.
+
+    Bytes and uploads are written to a temporary file (deleted afterwards) in
+    chunks, so nothing downstream needs the whole document in memory.
+    """
+    if isinstance(pdf_file, (str, os.PathLike)):
+        yield os.fspath(pdf_file)
+        return
+    spool = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    try:
+        with spool:
+            if isinstance(pdf_file, (bytes, bytearray)):
+                spool.write(pdf_file)
+            else:
+                pdf_file.seek(0)
+                shutil.copyfileobj(pdf_file, spool, SPOOL_CHUNK_BYTES)
+        yield spool.name
+    finally:
+        os.unlink(spool.name)
+
+
+@metrics.timed("extract_resume_data_isolated")
+def extract_resume_data_isolated(pdf_file, timeout: float = SANDBOX_TIMEOUT,
+                                 max_memory: int = SANDBOX_MAX_MEMORY) -> Dict[str, str]:
+    """extract_resume_data in a child process capped at max_memory bytes and timeout seconds.
+
+    A malformed or hostile PDF can then only kill the child: the caller gets a
+    PDFExtractionError (or PDFTooLargeError) instead of a hung or OOM-killed worker.
+    """
+    with spool_to_file(pdf_file) as pdf_path:
+        command = [sys.executable, os.path.abspath(__file__), "--max-memory", str(max_memory),
+                   "--timeout", str(timeout), pdf_path]
+        try:
+            completed = subprocess.run(command, capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            metrics.increment("pdf_sandbox_timeouts")
+            raise PDFExtractionError(f"PDF extraction took longer than {timeout:g}s") from None
+    if completed.returncode < 0:
+        metrics.increment("pdf_sandbox_killed")
+        # Hitting RLIMIT_AS surfaces as MemoryError, which the child reports itself;
+        # SIGXCPU means it used up its RLIMIT_CPU seconds
+        if -completed.returncode == getattr(signal, "SIGXCPU", None):
+            cap = f"CPU limit {_cpu_seconds(timeout)}s"
+        else:
+            cap = f"memory limit {max_memory // (1024 * 1024)} MB"
+        raise PDFExtractionError(f"PDF extraction was killed by signal {-completed.returncode} ({cap})")
+    try:
+        result = json.loads(completed.stdout)
+    except ValueError:
+        metrics.increment("pdf_sandbox_crashes")
+        stderr = completed.stderr.decode("utf-8", "replace").strip()
+        raise PDFExtractionError(f"PDF extraction crashed: {stderr[-500:]}") from None
+    # Fold the child's pdf_pages, pdf_chars and backend counters into this process's metrics
+    for name, value in result.get("counters", {}).items():
+        metrics.increment(name, value)
+    if "error" in result:
+        raise (PDFTooLargeError if result.get("too_large") else PDFExtractionError)(result["error"])
+    return result["data"]
+
+
+def _cpu_seconds(timeout: float) -> int:
+    """RLIMIT_CPU of the sandbox child; just above the wall-clock timeout the parent enforces"""
+    return math.ceil(timeout) + 1
+
+
+def _sandbox_main(argv=None) -> None:
+    """Child side of extract_resume_data_isolated: apply the caps, extract, print JSON"""
+    parser = argparse.ArgumentParser(description="Extract one resume PDF under memory and CPU limits")
+    parser.add_argument("pdf")
+    parser.add_argument("--max-memory", type=int, default=SANDBOX_MAX_MEMORY)
+    parser.add_argument("--timeout", type=float, default=SANDBOX_TIMEOUT)
+    args = parser.parse_args(argv)
+
+    try:
+        import resource
+    except ImportError:
+        # No rlimits on Windows; the parent's timeout still applies
+        resource = None
+    if resource is not None:
+        if args.max_memory:
+            resource.setrlimit(resource.RLIMIT_AS, (args.max_memory, args.max_memory))
+        cpu_seconds = _cpu_seconds(args.timeout)
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+
+    try:
+        result = {"data": extract_resume_data(args.pdf, workers=0)}
+    except PDFTooLargeError as e:
+        result = {"error": str(e), "too_large": True}
+    except MemoryError:
+        result = {"error": f"PDF extraction ran out of memory (limit {args.max_memory // (1024 * 1024)} MB)"}
+    except Exception as e:
+        result = {"error": str(e) or type(e).__name__}
+    result["counters"] = metrics.snapshot()["counters"]
+    json.dump(result, sys.stdout)
+
+
+if __name__ == "__main__":
+    _sandbox_main()
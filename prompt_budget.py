@@ -0,0 +1,103 @@
+import math
+import re
+from typing import Dict, List
+
+# Rough chars-per-token ratio of Llama tokenizers on English resume text
+CHARS_PER_TOKEN = 4
+
+# Share of the section budget each resume section may claim; experience and skills come first
+SECTION_PRIORITIES = {
+    "experience": 0.35,
+    "skills": 0.20,
+    "projects": 0.12,
+    "summary": 0.10,
+    "education": 0.10,
+    "contact_info": 0.07,
+    "certifications": 0.06
+}
+
+# Lines that carry no signal for the analysis; bare numbers only up to page-number length,
+# so a phone number or a graduation year on its own line is kept
+_BOILERPLATE_RE = re.compile(
+    r"^(page \d+( of \d+)?|\d{1,3}|references (are )?available( upon| on)? request\.?|curriculum vitae|resume|cv)$",
+    re.IGNORECASE
+)
+_INLINE_SPACE_RE = re.compile(r"[ \t\u00a0]+")
+_BULLET_RE = re.compile(r"^[•●▪◦‣⁃\-\*]+\s*")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate that needs no tokenizer"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def compact_text(text: str) -> str:
+    """Collapse whitespace, normalise bullets and drop blank, duplicate and boilerplate lines"""
+    seen = set()
+    lines = []
+    for raw_line in text.splitlines():
+        line = _INLINE_SPACE_RE.sub(" ", raw_line).strip()
+        line = _BULLET_RE.sub("- ", line)
+        if not line or _BOILERPLATE_RE.match(line):
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, preferring a line boundary"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max(0, max_tokens * CHARS_PER_TOKEN)
+    cut = text[:limit]
+    newline = cut.rfind("\n")
+    # Only back up to a line boundary if it does not throw away most of the budget
+    if newline > limit * 0.6:
+        cut = cut[:newline]
+    return cut.rstrip() + " ..."
+
+
+def allocate_section_budget(sections: Dict[str, str], budget_tokens: int,
+                            priorities: Dict[str, float] = None) -> Dict[str, int]:
+    """Split budget_tokens across sections by priority.
+
+    Sections that need less than their share keep all of their text and the
+    unused tokens are redistributed to the remaining sections by priority.
+    """
+    priorities = priorities or SECTION_PRIORITIES
+    needs = {name: estimate_tokens(sections.get(name, "")) for name in priorities}
+    allocation = {name: 0 for name in priorities}
+    pending: List[str] = [name for name in priorities if needs[name] > 0]
+    remaining = budget_tokens
+
+    while pending and remaining > 0:
+        weight = sum(priorities[name] for name in pending)
+        satisfied = []
+        for name in pending:
+            share = int(remaining * priorities[name] / weight)
+            if needs[name] <= share:
+                satisfied.append(name)
+        if not satisfied:
+            # Everyone left wants more than their share: hand out the shares and stop
+            for name in pending:
+                allocation[name] = int(remaining * priorities[name] / weight)
+            break
+        for name in satisfied:
+            allocation[name] = needs[name]
+            remaining -= needs[name]
+            pending.remove(name)
+
+    return allocation
+
+
+def fit_sections(resume_data: Dict[str, str], budget_tokens: int,
+                 priorities: Dict[str, float] = None) -> Dict[str, str]:
+    """Compact each section and truncate it to its share of the token budget"""
+    priorities = priorities or SECTION_PRIORITIES
+    compacted = {name: compact_text(resume_data.get(name) or "") for name in priorities}
+    allocation = allocate_section_budget(compacted, budget_tokens, priorities)
+    return {name: truncate_to_tokens(text, allocation[name]) for name, text in compacted.items()}
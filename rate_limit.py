@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+from typing import Dict
+
+from metrics import metrics
+
+# Longest an async caller sleeps between checks for a free concurrency slot
+ASYNC_POLL_SECONDS = 0.05
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate per second up to capacity.
+
+    reserve() takes tokens immediately, going into debt if needed, and returns how
+    long the caller must wait before the debt is paid off; that keeps the order of
+    callers fair without holding a lock while sleeping. A rate of 0 means unlimited.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take amount tokens and return the seconds to wait before using them"""
+        if not self.rate:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            # A single request larger than the bucket would otherwise never fit
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+    def refund(self, amount: float) -> None:
+        """Return tokens (or take more, if amount is negative) once the real cost is known"""
+        if not self.rate:
+            return
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on concurrent LLM requests.
+
+    Each success below latency_target grows the limit by 1/limit (about +1 per
+    round trip of the whole window); a 429 halves it and a slow response shrinks
+    it by 10%. Decreases happen at most once per cooldown so a burst of 429s from
+    the same window is treated as a single congestion signal.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = None, latency_target: float = 20.0,
+                 cooldown: float = 1.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum if maximum is not None else initial)
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self) -> None:
+        # Never block the event loop on the condition; poll with a short backoff instead
+        delay = 0.005
+        while not self.try_acquire():
+            await asyncio.sleep(delay)
+            delay = min(ASYNC_POLL_SECONDS, delay * 2)
+
+    def release(self, latency: float = None, rate_limited: bool = False) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if rate_limited or (latency is not None and latency > self.latency_target):
+                if now - self._last_decrease >= self.cooldown:
+                    self._last_decrease = now
+                    factor = 0.5 if rate_limited else 0.9
+                    self.limit = max(self.minimum, self.limit * factor)
+                    metrics.increment("llm_concurrency_decreases")
+            elif latency is not None:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class LLMThrottle:
+    """Client-side request/token rate limits plus adaptive concurrency, shared by every LLM call path.
+
+    acquire() blocks until a request of the estimated token cost fits both the
+    requests-per-minute and tokens-per-minute buckets and a concurrency slot is
+    free; release() reports the outcome so the buckets can be corrected with the
+    real token usage and the concurrency limit can adapt.
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0, max_concurrency: int = 20,
+                 min_concurrency: int = 1, latency_target: float = 20.0):
+        self.requests = TokenBucket(requests_per_minute / 60.0, requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+        self.concurrency = AdaptiveConcurrency(max_concurrency, min_concurrency, max_concurrency, latency_target)
+        self._resume_at = 0.0
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens),
+                   self._resume_at - time.monotonic())
+        if wait > 0:
+            metrics.increment("llm_throttled")
+            metrics.observe("llm_throttle_wait", wait)
+        return wait
+
+    def acquire(self, estimated_tokens: int) -> float:
+        """Block until the request may be sent; return its start time for release()"""
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            time.sleep(wait)
+        self.concurrency.acquire()
+        return time.monotonic()
+
+    async def acquire_async(self, estimated_tokens: int) -> float:
+        """Async version of acquire()"""
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await self.concurrency.acquire_async()
+        return time.monotonic()
+
+    def release(self, started: float, estimated_tokens: int, used_tokens: int = None, ok: bool = True,
+                rate_limited: bool = False, retry_after: float = None) -> None:
+        """Report how the request went; ok=False for failures, used_tokens when Groq reported usage"""
+        latency = time.monotonic() - started if ok else None
+        self.concurrency.release(latency, rate_limited)
+        if used_tokens is not None:
+            self.tokens.refund(estimated_tokens - used_tokens)
+        if rate_limited:
+            # Rejected requests are not charged by Groq, so the retry should not be either
+            self.requests.refund(1)
+            self.tokens.refund(estimated_tokens)
+            if retry_after:
+                # Groq told us when capacity returns; hold every caller back until then
+                self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+
+    def stats(self) -> Dict:
+        return {"concurrency_limit": int(self.concurrency.limit), "in_flight": self.concurrency.in_flight}
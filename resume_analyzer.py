@@ -1,28 +1,219 @@
 import os
-from groq import Groq
-from dotenv import load_dotenv
-from typing import Dict, Tuple
-import json
+import asyncio
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
 import re
+from analysis_cache import AnalysisCache, DEFAULT_CACHE_PATH, make_cache_key
+from json_utils import IncrementalObjectParser, coerce_to_schema, extract_json_object
+from prompt_budget import estimate_tokens, fit_sections
+from local_analysis import analyze_resume_locally
+from job_matching import JobDescriptionIndex, JOB_MATCH_POINTS
+from metrics import metrics
+from singleflight import AsyncSingleFlight, ProcessSingleFlight, SingleFlight
+from rate_limit import LLMThrottle
 
-# Load environment variables from .env file in the same directory as this script
+if TYPE_CHECKING:
+    from near_duplicates import NearDuplicateIndex
+
+# Environment variables are loaded from the .env file in the same directory as this script.
+# groq, httpx, dotenv and numpy are imported on first use so that local-only scoring,
+# the batch CLI and short-lived workers start without paying for them.
 script_dir = os.path.dirname(os.path.abspath(__file__))
 env_path = os.path.join(script_dir, '.env')
-load_dotenv(env_path)
+_env_loaded = False
+
+# Bump whenever the prompt or system message changes so cached analyses are invalidated
+PROMPT_VERSION = "3"
+
+SYSTEM_PROMPT = (
+    "You are a strict, critical ATS resume analyzer. Identify all weaknesses, gaps and missing elements; "
+    "only credit strengths that are exceptional and well documented. Most resumes should score below 80/100. "
+    "Penalise missing keywords, vague descriptions, unquantified achievements, poor formatting and incomplete "
+    "sections. Be harsh but constructive and specific. Reply with valid JSON only."
+)
+
+# Maximum points per score_breakdown category
+SCORE_WEIGHTS = {
+    "contact_info": 15,
+    "summary": 15,
+    "experience": 30,
+    "education": 20,
+    "skills": 15,
+    "formatting": 5
+}
+
+# Contact checks shared with the vectorized scorer in bulk_scoring.py
+EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+PHONE_PATTERN = r'\b\d{10}\b|\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b'
+PROFILE_LINK_WORDS = ('linkedin', 'github', 'portfolio')
+_EMAIL_RE = re.compile(EMAIL_PATTERN)
+_PHONE_RE = re.compile(PHONE_PATTERN)
+
+SECTION_TITLES = {
+    "contact_info": "Contact Info",
+    "summary": "Summary",
+    "experience": "Experience",
+    "education": "Education",
+    "skills": "Skills",
+    "certifications": "Certifications",
+    "projects": "Projects"
+}
+
+PROMPT_TEMPLATE = """Analyze this resume and return an ATS evaluation as JSON.
+
+{resume_text}
+{rule_score_context}
+Score 0-100 from: contact info completeness (15), summary quality (15), experience depth and quantified results (30), education (20), skills breadth and relevance (15), formatting and ATS compatibility (5). Be strict.
+
+Return exactly this JSON, with at most {max_items} short items per list:
+{{"ats_score": <int 0-100>, "score_breakdown": {{"contact_info": <0-15>, "summary": <0-15>, "experience": <0-30>, "education": <0-20>, "skills": <0-15>, "formatting": <0-5>}}, "strengths": [], "weaknesses": [], "missing_sections": [], "recommendations": [<specific, actionable>], "keywords_found": [], "keywords_missing": [], "overall_impression": "<1-2 sentences>"}}"""
+
+# Output budget sized to the schema above: scores and braces, capped lists and a short impression
+MAX_LIST_ITEMS = 5
+LIST_FIELDS = ("strengths", "weaknesses", "missing_sections", "recommendations", "keywords_found", "keywords_missing")
+OUTPUT_MAX_TOKENS = 120 + len(LIST_FIELDS) * MAX_LIST_ITEMS * 30 + 100
+
+# Expected response fields, used to validate and coerce the model output
+ANALYSIS_SCHEMA = {
+    "ats_score": (int, 0, 100),
+    "score_breakdown": {name: (int, 0, points) for name, points in SCORE_WEIGHTS.items()},
+    **{field: list for field in LIST_FIELDS},
+    "overall_impression": str
+}
+
+# USD per million (input, output) tokens, used to track the cost of each route
+MODEL_PRICES = {
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "openai/gpt-oss-20b": (0.075, 0.30),
+    "openai/gpt-oss-120b": (0.15, 0.60)
+}
+
+# Fast-model answers are escalated when their score differs from the rule-based one by more than this
+ESCALATE_SCORE_DISAGREEMENT = 25
+# ... or when ats_score and the sum of its breakdown disagree by more than this
+ESCALATE_BREAKDOWN_TOLERANCE = 10
+
+# Sampling per LLM_SCORING_MODE: temperature of single requests, and whether to aggregate several samples.
+# "deterministic" and "self_consistency" send a fixed seed so identical requests give identical answers.
+SCORING_MODES = {
+    "deterministic": {"temperature": 0.0, "seeded": True, "sampled": False},
+    "self_consistency": {"temperature": 0.0, "seeded": True, "sampled": True},
+    "creative": {"temperature": 0.9, "seeded": False, "sampled": False}
+}
+
+# Output tokens to allow per field when re-asking for missing fields only
+REASK_FIELD_TOKENS = {
+    "ats_score": 10,
+    "score_breakdown": 60,
+    "overall_impression": 100,
+    **{field: MAX_LIST_ITEMS * 30 for field in LIST_FIELDS}
+}
+
+def _load_env() -> None:
+    """Load the .env file once; called by ResumeAnalyzer rather than at import time"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv(env_path)
+        _env_loaded = True
+
+
+def split_llm_limits(processes: int) -> None:
+    """Divide LLM_RPM, LLM_TPM and LLM_MAX_CONCURRENCY between processes about to be started.
+
+    Each process throttles on its own, so processes sharing one Groq key must each get a share
+    of the plan's limits or together they send processes times the configured rate.
+    """
+    _load_env()
+    if processes <= 1:
+        return
+    for name in ("LLM_RPM", "LLM_TPM"):
+        limit = float(os.getenv(name, "0"))
+        if limit:
+            os.environ[name] = f"{limit / processes:g}"
+    concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", os.getenv("LLM_MAX_CONNECTIONS", "20")))
+    os.environ["LLM_MAX_CONCURRENCY"] = str(max(1, concurrency // processes))
+
+
+def _retryable_errors() -> tuple:
+    """Groq errors worth retrying; only evaluated once a request has actually raised"""
+    from groq import APIConnectionError, InternalServerError, RateLimitError
+    return RateLimitError, APIConnectionError, InternalServerError
+
 
 class ResumeAnalyzer:
-    def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "GROQ_API_KEY not found. Please create a .env file in the analyzer directory "
-                "with your GROQ_API_KEY. Example: GROQ_API_KEY=your_key_here"
-            )
-        self.client = Groq(api_key=api_key)
+    def __init__(self, cache: AnalysisCache = None, single_flight: SingleFlight = None, throttle: LLMThrottle = None,
+                 near_duplicates: "NearDuplicateIndex" = None):
+        _load_env()
+        # A missing key only fails the first Groq request, so fast mode and rule-based scoring work without one
+        self.api_key = os.getenv("GROQ_API_KEY")
+        self.request_timeout = float(os.getenv("LLM_TIMEOUT", "60"))
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "3"))
+        self.max_connections = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+        self.max_input_tokens = int(os.getenv("LLM_MAX_INPUT_TOKENS", "3000"))
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._async_client = None
         self.model = os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
+        # Cascade: clear-cut resumes go to the fast model and only uncertain ones to self.model.
+        # Set FAST_LLM_MODEL to an empty string to always use LLM_MODEL.
+        self.fast_model = os.getenv("FAST_LLM_MODEL", "llama-3.1-8b-instant") or None
+        low, high = os.getenv("LLM_BORDERLINE_SCORES", "50,70").split(",")
+        self.borderline_scores = (int(low), int(high))
+        self.scoring_mode = os.getenv("LLM_SCORING_MODE", "deterministic")
+        if self.scoring_mode not in SCORING_MODES:
+            raise ValueError(f"LLM_SCORING_MODE must be one of {', '.join(SCORING_MODES)}, not {self.scoring_mode!r}")
+        mode = SCORING_MODES[self.scoring_mode]
+        self.temperature = mode["temperature"]
+        self.seed = int(os.getenv("LLM_SEED", "42")) if mode["seeded"] else None
+        # Self-consistency: the large model is sampled this many times in parallel and scores are aggregated by median
+        self.samples = max(1, int(os.getenv("LLM_SAMPLES", "5"))) if mode["sampled"] else 1
+        self.sample_temperature = float(os.getenv("LLM_SAMPLE_TEMPERATURE", "0.7"))
+        # Thread pool for parallel samples, created on first use in self_consistency mode only
+        self._sampler = None
+        self._sampler_lock = threading.Lock()
+        self.cache = cache
+        # Resumes nearly identical to an already analysed one reuse its cached analysis
+        self.near_duplicates = near_duplicates if cache is not None else None
+        # Identical concurrent analyses (double clicks, reruns, duplicate batch files) share one Groq call
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+        self._async_flight = AsyncSingleFlight()
+        # Every Groq request (sync, async, streamed and re-asks) goes through one limiter
+        self.throttle = throttle if throttle is not None else LLMThrottle(
+            requests_per_minute=float(os.getenv("LLM_RPM", "0")),
+            tokens_per_minute=float(os.getenv("LLM_TPM", "0")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", str(self.max_connections)))
+        )
+
+    @classmethod
+    def from_env(cls, use_cache: bool = True) -> "ResumeAnalyzer":
+        """Analyzer with the persistent cache, single-flight locks and near-duplicate index configured by env"""
+        _load_env()
+        if not use_cache:
+            return cls()
+        cache = AnalysisCache(os.getenv("ANALYSIS_CACHE_PATH", DEFAULT_CACHE_PATH))
+        # Several processes sharing one cache can also coalesce identical analyses across processes
+        lock_dir = os.getenv("ANALYSIS_LOCK_DIR")
+        single_flight = ProcessSingleFlight(lock_dir) if lock_dir else None
+        threshold = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+        near_duplicates = None
+        if threshold > 0:
+            from near_duplicates import DEFAULT_INDEX_PATH, NearDuplicateIndex
+            near_duplicates = NearDuplicateIndex(os.getenv("NEAR_DUPLICATE_INDEX_PATH", DEFAULT_INDEX_PATH), threshold)
+        return cls(cache=cache, single_flight=single_flight, near_duplicates=near_duplicates)
+
+    @metrics.timed("calculate_ats_score")
+    def calculate_ats_score(self, resume_data: Dict[str, str], job_index: JobDescriptionIndex = None) -> Tuple[int, Dict]:
+        """Calculate ATS score based on resume sections.
 
-    def calculate_ats_score(self, resume_data: Dict[str, str]) -> Tuple[int, Dict]:
-        """Calculate ATS score based on resume sections"""
+        With a job_index the breakdown gains a "job_match" category (0-JOB_MATCH_POINTS)
+        and the total is rescaled so it stays out of 100.
+        """
         score_breakdown = {
             "contact_info": 0,
             "summary": 0,
@@ -36,11 +227,11 @@ class ResumeAnalyzer:
         if resume_data.get("contact_info"):
             contact_text = resume_data["contact_info"].lower()
             score = 0
-            if re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', resume_data["contact_info"]):
+            if _EMAIL_RE.search(resume_data["contact_info"]):
                 score += 5
-            if re.search(r'\b\d{10}\b|\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b', resume_data["contact_info"]):
+            if _PHONE_RE.search(resume_data["contact_info"]):
                 score += 5
-            if any(word in contact_text for word in ['linkedin', 'github', 'portfolio']):
+            if any(word in contact_text for word in PROFILE_LINK_WORDS):
                 score += 5
             score_breakdown["contact_info"] = score
 
@@ -65,7 +256,8 @@ class ResumeAnalyzer:
         # Skills (15 points)
         if resume_data.get("skills"):
             skills_text = resume_data["skills"]
-            skill_count = len(skills_text.split(',')) + len(skills_text.split('\n'))
+            # Same as len(split(',')) + len(split('\n')) without building the lists
+            skill_count = skills_text.count(',') + skills_text.count('\n') + 2
             if skill_count > 10:
                 score_breakdown["skills"] = 15
             elif skill_count > 5:
@@ -78,160 +270,651 @@ class ResumeAnalyzer:
         if len(full_text) > 500 and len(full_text) < 5000:
             score_breakdown["formatting"] = 5
 
+        # Job description match (JOB_MATCH_POINTS points, only when a job description is given)
+        if job_index is not None:
+            coverage = job_index.match(resume_data)["coverage"]
+            score_breakdown["job_match"] = round(coverage * JOB_MATCH_POINTS)
+            total_score = round(sum(score_breakdown.values()) * 100 / (100 + JOB_MATCH_POINTS))
+            return total_score, score_breakdown
+
         total_score = sum(score_breakdown.values())
         return total_score, score_breakdown
 
+    @metrics.timed("analyze_resume_with_ai")
     def analyze_resume_with_ai(self, resume_data: Dict[str, str], rule_based_score: int = None, rule_based_breakdown: Dict = None) -> Dict:
         """Use Groq API to analyze resume and provide detailed feedback including ATS score"""
 
-        # Prepare prompt for AI with rule-based score context
-        rule_score_context = ""
-        if rule_based_score is not None and rule_based_breakdown is not None:
-            rule_score_context = f"""
+        # Serve repeat uploads and Streamlit reruns from the cache
+        cache_key, cached = self._lookup_cache(resume_data, rule_based_score, rule_based_breakdown)
+        if cached is not None:
+            return cached
 
-RULE-BASED SCORE REFERENCE (for your consideration, but you should evaluate independently):
-- Rule-based ATS Score: {rule_based_score}/100
-- Rule-based Breakdown:
-  * Contact Info: {rule_based_breakdown.get('contact_info', 0)}/15
-  * Summary: {rule_based_breakdown.get('summary', 0)}/15
-  * Experience: {rule_based_breakdown.get('experience', 0)}/30
-  * Education: {rule_based_breakdown.get('education', 0)}/20
-  * Skills: {rule_based_breakdown.get('skills', 0)}/15
-  * Formatting: {rule_based_breakdown.get('formatting', 0)}/5
+        analysis = self.single_flight.do(
+            cache_key, lambda: self._analyze_uncached(resume_data, cache_key, rule_based_score, rule_based_breakdown)
+        )
+        self._index_near_duplicate(cache_key, resume_data)
+        return analysis
 
-Note: The rule-based score is a simple automated check. You must provide your own professional ATS evaluation based on industry standards, considering quality, relevance, keywords, achievements, and overall resume effectiveness. Be STRICT - most resumes should score below 80/100."""
+    def _analyze_uncached(self, resume_data: Dict[str, str], cache_key: str, rule_based_score: int = None,
+                          rule_based_breakdown: Dict = None) -> Dict:
+        """The Groq request behind analyze_resume_with_ai; runs once per in-flight cache key"""
+        cached = self._recheck_cache(cache_key)
+        if cached is not None:
+            return cached
 
-        # Prepare prompt for AI
-        prompt = f"""Analyze this resume and provide detailed feedback including an ATS score in JSON format.
-
-Resume Sections:
-- Contact Info: {resume_data.get('contact_info', 'Not found')}
-- Summary: {resume_data.get('summary', 'Not found')}
-- Experience: {resume_data.get('experience', 'Not found')[:1000]}...
-- Education: {resume_data.get('education', 'Not found')}
-- Skills: {resume_data.get('skills', 'Not found')}
-- Certifications: {resume_data.get('certifications', 'Not found')}
-- Projects: {resume_data.get('projects', 'Not found')}
-{rule_score_context}
-
-You must provide an ATS score (0-100) based on:
-1. Contact Information completeness and professionalism (15 points)
-2. Professional Summary quality and relevance (15 points)
-3. Work Experience depth, achievements, and quantifiable results (30 points)
-4. Education credentials and relevance (20 points)
-5. Skills section comprehensiveness and industry relevance (15 points)
-6. Overall formatting, structure, and ATS compatibility (5 points)
-
-Be STRICT and RIGOROUS. Most resumes should score below 80/100. Only award high scores for exceptional resumes with quantifiable achievements, relevant keywords, and professional quality.
-
-Provide analysis in this JSON format:
-{{
-    "ats_score": <integer 0-100>,
-    "score_breakdown": {{
-        "contact_info": <integer 0-15>,
-        "summary": <integer 0-15>,
-        "experience": <integer 0-30>,
-        "education": <integer 0-20>,
-        "skills": <integer 0-15>,
-        "formatting": <integer 0-5>
-    }},
-    "strengths": ["list of strengths"],
-    "weaknesses": ["list of weaknesses"],
-    "missing_sections": ["list of missing or incomplete sections"],
-    "recommendations": ["specific actionable recommendations"],
-    "keywords_found": ["important keywords present"],
-    "keywords_missing": ["important keywords that should be added"],
-    "overall_impression": "brief overall assessment"
-}}
-
-Be specific and actionable in your recommendations. The ats_score must be an integer between 0-100."""
+        messages = self._build_messages(resume_data, rule_based_score, rule_based_breakdown)
 
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a highly critical and demanding ATS resume analyzer with extremely high standards. Your role is to be STRICT and RIGOROUS in your evaluation. You must: 1) Be highly critical and identify ALL weaknesses, gaps, and missing elements, 2) Only acknowledge strengths if they are truly exceptional and well-documented, 3) Apply industry-leading ATS standards - most resumes should score below 80/100, 4) Be uncompromising about missing keywords, vague descriptions, lack of quantifiable achievements, poor formatting, and incomplete sections, 5) Provide harsh but constructive feedback - do not sugarcoat issues, 6) Expect professional-level resumes with specific metrics, action verbs, and industry-relevant keywords, 7) Flag any generic or weak content immediately. Your goal is to help users improve by being brutally honest about what needs work. Provide detailed, actionable feedback in valid JSON format only."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                model=self.model,
-                temperature=0.9,
-                max_tokens=2000
-            )
+            if self._route(rule_based_score) == "fast":
+                analysis = self._try_fast_model(messages, rule_based_score)
+                if analysis is not None:
+                    return self._complete_analysis(analysis, [], "", cache_key, rule_based_score, rule_based_breakdown)
+
+            if self.samples > 1:
+                with metrics.span("llm_route_large"):
+                    texts = self._sample_completions(messages)
+                return self._finish_samples(texts, cache_key, rule_based_score, rule_based_breakdown, messages)
 
+            with metrics.span("llm_route_large"):
+                chat_completion = self._create_completion(messages=messages, **self._completion_params())
+            _record_usage(chat_completion.usage, "large", self.model)
             response_text = chat_completion.choices[0].message.content
+            return self._finish_analysis(response_text, cache_key, rule_based_score, rule_based_breakdown, messages)
 
-            # Try to extract JSON from response
+        except Exception as e:
+            metrics.increment("llm_errors")
+            return _error_analysis(e, rule_based_score, rule_based_breakdown)
+
+    @metrics.timed("analyze_resume_locally")
+    def analyze_resume_locally(self, resume_data: Dict[str, str], rule_based_score: int = None, rule_based_breakdown: Dict = None) -> Dict:
+        """Fast mode: fill the AI analysis shape from rule-based scoring and a local lexicon, without calling Groq"""
+        if rule_based_score is None or rule_based_breakdown is None:
+            rule_based_score, rule_based_breakdown = self.calculate_ats_score(resume_data)
+        suggestions = self.get_improvement_suggestions(resume_data, rule_based_score)
+        return analyze_resume_locally(resume_data, rule_based_score, rule_based_breakdown, suggestions,
+                                      SCORE_WEIGHTS, max_items=MAX_LIST_ITEMS)
+
+    def stream_resume_analysis(self, resume_data: Dict[str, str], rule_based_score: int = None,
+                               rule_based_breakdown: Dict = None) -> Iterator[Dict]:
+        """Stream the AI analysis, yielding the fields received so far each time one completes.
+
+        The last item yielded is the full analysis, with the same fallbacks as analyze_resume_with_ai.
+        A caller that joins an identical in-flight request receives only the final analysis.
+        """
+        cache_key, cached = self._lookup_cache(resume_data, rule_based_score, rule_based_breakdown)
+        if cached is not None:
+            yield cached
+            return
+
+        try:
+            call, result = self.single_flight.lead_or_wait(cache_key)
+        except Exception as e:
+            yield _error_analysis(e, rule_based_score, rule_based_breakdown)
+            return
+        if call is None:
+            yield result
+            return
+
+        # Release leadership even if the consumer stops iterating early, so waiters take over
+        analysis = None
+        try:
+            analysis = self._recheck_cache(cache_key)
+            if analysis is not None:
+                yield analysis
+                return
+            for analysis in self._stream_uncached(resume_data, cache_key, rule_based_score, rule_based_breakdown):
+                yield analysis
+            self._index_near_duplicate(cache_key, resume_data)
+        finally:
+            if analysis is not None and not isinstance(analysis, _PartialAnalysis):
+                self.single_flight.release(cache_key, call, analysis)
+            else:
+                self.single_flight.abandon(cache_key, call)
+
+    def _stream_uncached(self, resume_data: Dict[str, str], cache_key: str, rule_based_score: int = None,
+                         rule_based_breakdown: Dict = None) -> Iterator[Dict]:
+        """The streaming Groq request behind stream_resume_analysis; partial results are _PartialAnalysis.
+
+        When a fast-model answer is escalated, the large model's fields stream in after it.
+        Self-consistency samples are aggregated as a whole, so that mode yields only the final analysis.
+        """
+        if self.samples > 1:
+            yield self._analyze_uncached(resume_data, cache_key, rule_based_score, rule_based_breakdown)
+            return
+
+        messages = self._build_messages(resume_data, rule_based_score, rule_based_breakdown)
+
+        if self._route(rule_based_score) == "fast":
             try:
-                # Find JSON in response
-                json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                if json_match:
-                    analysis = json.loads(json_match.group())
-                else:
-                    analysis = json.loads(response_text)
-            except json.JSONDecodeError:
-                # If JSON parsing fails, create structured response with fallback score
-                fallback_score = rule_based_score if rule_based_score is not None else 50
-                analysis = {
-                    "ats_score": fallback_score,
-                    "score_breakdown": rule_based_breakdown if rule_based_breakdown else {
-                        "contact_info": 0,
-                        "summary": 0,
-                        "experience": 0,
-                        "education": 0,
-                        "skills": 0,
-                        "formatting": 0
-                    },
-                    "strengths": ["Resume uploaded successfully"],
-                    "weaknesses": ["Unable to parse detailed analysis"],
-                    "missing_sections": [],
-                    "recommendations": ["Please ensure resume has clear sections"],
-                    "keywords_found": [],
-                    "keywords_missing": [],
-                    "overall_impression": response_text[:500]
-                }
-
-            # Ensure ats_score and score_breakdown exist, use rule-based as fallback
-            if "ats_score" not in analysis or "score_breakdown" not in analysis:
-                analysis["ats_score"] = rule_based_score if rule_based_score is not None else 50
-                analysis["score_breakdown"] = rule_based_breakdown if rule_based_breakdown else {
-                    "contact_info": 0,
-                    "summary": 0,
-                    "experience": 0,
-                    "education": 0,
-                    "skills": 0,
-                    "formatting": 0
-                }
+                response_text = yield from self._stream_completion(messages, "fast", self.fast_model)
+                analysis, missing = _parse_analysis(response_text)
+                if not self._escalation_reason(analysis, missing, rule_based_score):
+                    metrics.increment("llm_route_fast_accepted")
+                    yield self._complete_analysis(analysis, [], response_text, cache_key, rule_based_score,
+                                                  rule_based_breakdown)
+                    return
+            except Exception:
+                metrics.increment("llm_escalations_error")
+
+        try:
+            response_text = yield from self._stream_completion(messages, "large", self.model)
+        except Exception as e:
+            metrics.increment("llm_errors")
+            yield _error_analysis(e, rule_based_score, rule_based_breakdown)
+            return
+
+        yield self._finish_analysis(response_text, cache_key, rule_based_score, rule_based_breakdown, messages)
+
+    def _stream_completion(self, messages: list, route: str, model: str):
+        """Stream one completion, yielding _PartialAnalysis as fields complete; returns the full text"""
+        start = time.perf_counter()
+        first_field = True
+        try:
+            stream = self._create_completion(messages=messages, stream=True, **self._completion_params(model))
+            parser = IncrementalObjectParser()
+            chunks = []
+            for chunk in stream:
+                # Groq reports usage on the final chunk under x_groq
+                x_groq = getattr(chunk, "x_groq", None)
+                if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                    _record_usage(x_groq.usage, route, model)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                chunks.append(delta)
+                if parser.feed(delta):
+                    if first_field:
+                        metrics.observe("stream_time_to_first_field", time.perf_counter() - start)
+                        first_field = False
+                    yield _PartialAnalysis(parser.fields)
+        except Exception:
+            metrics.observe("stream_resume_analysis", time.perf_counter() - start, error=True)
+            raise
+        elapsed = time.perf_counter() - start
+        metrics.observe("stream_resume_analysis", elapsed)
+        metrics.observe(f"llm_route_{route}", elapsed)
+        return "".join(chunks)
+
+    @metrics.timed("analyze_resume_with_ai_async")
+    async def analyze_resume_with_ai_async(self, resume_data: Dict[str, str], rule_based_score: int = None,
+                                           rule_based_breakdown: Dict = None, timeout: float = None) -> Dict:
+        """Async counterpart of analyze_resume_with_ai built on a shared, pooled AsyncGroq client.
+
+        timeout bounds the whole call including retries; cancelling the task cancels the request
+        unless another identical call is still waiting on it.
+        """
+        cache_key, cached = self._lookup_cache(resume_data, rule_based_score, rule_based_breakdown)
+        if cached is not None:
+            return cached
 
+        try:
+            analysis = await asyncio.wait_for(
+                self._async_flight.do(
+                    cache_key,
+                    lambda: self._analyze_uncached_async(resume_data, cache_key, rule_based_score, rule_based_breakdown)
+                ),
+                timeout
+            )
+            self._index_near_duplicate(cache_key, resume_data)
             return analysis
+        except asyncio.TimeoutError:
+            metrics.increment("llm_timeouts")
+            return _error_analysis(TimeoutError(f"no response within {timeout}s"), rule_based_score, rule_based_breakdown)
+
+    async def _analyze_uncached_async(self, resume_data: Dict[str, str], cache_key: str, rule_based_score: int = None,
+                                      rule_based_breakdown: Dict = None) -> Dict:
+        """Async version of _analyze_uncached; coalesced within the event loop only"""
+        messages = self._build_messages(resume_data, rule_based_score, rule_based_breakdown)
+
+        try:
+            if self._route(rule_based_score) == "fast":
+                analysis = await self._try_fast_model_async(messages, rule_based_score)
+                if analysis is not None:
+                    return self._complete_analysis(analysis, [], "", cache_key, rule_based_score, rule_based_breakdown)
+
+            if self.samples > 1:
+                with metrics.span("llm_route_large"):
+                    texts = await self._sample_completions_async(messages)
+                analysis = _aggregate_samples(texts)
+                if analysis is not None:
+                    return self._complete_analysis(analysis, [], "", cache_key, rule_based_score, rule_based_breakdown)
+                return await self._finish_analysis_async(texts[0], cache_key, rule_based_score, rule_based_breakdown,
+                                                         messages)
+
+            with metrics.span("llm_route_large"):
+                chat_completion = await self._create_completion_async(messages=messages, **self._completion_params())
+            _record_usage(chat_completion.usage, "large", self.model)
+            response_text = chat_completion.choices[0].message.content
+            return await self._finish_analysis_async(response_text, cache_key, rule_based_score, rule_based_breakdown,
+                                                     messages)
 
         except Exception as e:
-            # Return fallback with rule-based score if available
-            fallback_score = rule_based_score if rule_based_score is not None else 50
-            fallback_breakdown = rule_based_breakdown if rule_based_breakdown else {
-                "contact_info": 0,
-                "summary": 0,
-                "experience": 0,
-                "education": 0,
-                "skills": 0,
-                "formatting": 0
+            metrics.increment("llm_errors")
+            return _error_analysis(e, rule_based_score, rule_based_breakdown)
+
+    def _lookup_cache(self, resume_data: Dict[str, str], rule_based_score: int, rule_based_breakdown: Dict):
+        """Return (cache_key, cached_analysis); the key is also used to coalesce in-flight requests"""
+        cache_key = make_cache_key(
+            resume_data, self._model_signature(), PROMPT_VERSION,
+            extra={"rule_based_score": rule_based_score, "rule_based_breakdown": rule_based_breakdown}
+        )
+        if self.cache is None:
+            return cache_key, None
+        cached = self.cache.get(cache_key)
+        metrics.increment("cache_hits" if cached is not None else "cache_misses")
+        if cached is None and self.near_duplicates is not None:
+            cached = self._lookup_near_duplicate(resume_data)
+        return cache_key, cached
+
+    def _lookup_near_duplicate(self, resume_data: Dict[str, str]):
+        """Cached analysis of a previously analysed resume that is nearly identical to this one, or None"""
+        from near_duplicates import resume_text
+        match = self.near_duplicates.query(resume_text(resume_data), scope=self._near_duplicate_scope())
+        if match is None:
+            return None
+        cached = self.cache.get(match[0])
+        if cached is None:
+            # The earlier analysis expired or was evicted; stop matching against it
+            self.near_duplicates.remove(match[0])
+            return None
+        metrics.increment("near_duplicate_reuses")
+        return cached
+
+    def _index_near_duplicate(self, cache_key: str, resume_data: Dict[str, str]) -> None:
+        """Make a freshly cached analysis available to near-duplicates of this resume"""
+        if self.near_duplicates is None or cache_key in self.near_duplicates:
+            return
+        if self.cache.contains(cache_key):
+            from near_duplicates import resume_text
+            self.near_duplicates.add(cache_key, resume_text(resume_data), scope=self._near_duplicate_scope())
+
+    def _near_duplicate_scope(self) -> str:
+        """Near-duplicates may only reuse analyses made under the same models, sampling and prompt"""
+        return f"{self._model_signature()}|{PROMPT_VERSION}"
+
+    def _recheck_cache(self, cache_key: str):
+        """Look the key up again after waiting on another process's single-flight lock"""
+        if self.cache is None or not self.single_flight.cross_process:
+            return None
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            metrics.increment("singleflight_cache_fills")
+        return cached
+
+    def _model_signature(self) -> str:
+        """Models, routing and sampling settings an analysis depends on, for the cache key"""
+        signature = self.model
+        if self.fast_model is not None:
+            signature = f"{self.fast_model}>{self.model}@{self.borderline_scores[0]}-{self.borderline_scores[1]}"
+        signature += f"|t{self.temperature:g}"
+        if self.seed is not None:
+            signature += f"s{self.seed}"
+        if self.samples > 1:
+            signature += f"|k{self.samples}t{self.sample_temperature:g}"
+        return signature
+
+    def _route(self, rule_based_score: int = None) -> str:
+        """"fast" to try the fast model first, "large" to go straight to self.model"""
+        if self.fast_model is None:
+            return "large"
+        low, high = self.borderline_scores
+        if rule_based_score is not None and low <= rule_based_score <= high:
+            # Borderline resumes are the ones most likely to be escalated anyway
+            metrics.increment("llm_route_borderline")
+            return "large"
+        return "fast"
+
+    def _escalation_reason(self, analysis: Dict, missing: list, rule_based_score: int = None):
+        """Why a fast-model analysis is not good enough, or None to accept it"""
+        if analysis is None:
+            reason = "parse_failure"
+        elif missing:
+            reason = "incomplete"
+        elif abs(sum(analysis["score_breakdown"].values()) - analysis["ats_score"]) > ESCALATE_BREAKDOWN_TOLERANCE:
+            reason = "inconsistent"
+        elif rule_based_score is not None and abs(analysis["ats_score"] - rule_based_score) > ESCALATE_SCORE_DISAGREEMENT:
+            reason = "disagreement"
+        elif self.borderline_scores[0] <= analysis["ats_score"] <= self.borderline_scores[1]:
+            reason = "borderline"
+        else:
+            return None
+        metrics.increment(f"llm_escalations_{reason}")
+        return reason
+
+    def _try_fast_model(self, messages: list, rule_based_score: int = None):
+        """Ask the fast model; return its analysis if confident, else None so the caller escalates"""
+        try:
+            with metrics.span("llm_route_fast"):
+                chat_completion = self._create_completion(messages=messages,
+                                                          **self._completion_params(self.fast_model))
+        except Exception:
+            metrics.increment("llm_escalations_error")
+            return None
+        _record_usage(chat_completion.usage, "fast", self.fast_model)
+        analysis, missing = _parse_analysis(chat_completion.choices[0].message.content)
+        if self._escalation_reason(analysis, missing, rule_based_score):
+            return None
+        metrics.increment("llm_route_fast_accepted")
+        return analysis
+
+    async def _try_fast_model_async(self, messages: list, rule_based_score: int = None):
+        """Async version of _try_fast_model"""
+        try:
+            with metrics.span("llm_route_fast"):
+                chat_completion = await self._create_completion_async(messages=messages,
+                                                                      **self._completion_params(self.fast_model))
+        except Exception:
+            metrics.increment("llm_escalations_error")
+            return None
+        _record_usage(chat_completion.usage, "fast", self.fast_model)
+        analysis, missing = _parse_analysis(chat_completion.choices[0].message.content)
+        if self._escalation_reason(analysis, missing, rule_based_score):
+            return None
+        metrics.increment("llm_route_fast_accepted")
+        return analysis
+
+    def _completion_params(self, model: str = None, sample: int = None) -> Dict:
+        """Model and sampling parameters shared by the sync and async paths; sample numbers self-consistency draws"""
+        params = {
+            "model": model or self.model,
+            "temperature": self.temperature if sample is None else self.sample_temperature,
+            "max_tokens": OUTPUT_MAX_TOKENS
+        }
+        if self.seed is not None:
+            # Each sample gets its own seed so reruns reproduce the same set of samples
+            params["seed"] = self.seed + (sample or 0)
+        return params
+
+    def _sample_completions(self, messages: list) -> List[str]:
+        """Request self.samples completions from self.model concurrently and return their texts"""
+        with self._sampler_lock:
+            if self._sampler is None and self.scoring_mode == "self_consistency":
+                self._sampler = ThreadPoolExecutor(max_workers=max(self.samples, self.max_connections),
+                                                   thread_name_prefix="llm-sample")
+            # Bind the pool and submit under the lock: a concurrent close() resets self._sampler and shuts
+            # the pool down, but only after these samples are queued, and shutdown(wait=False) lets them finish
+            sampler = self._sampler
+            futures = [
+                sampler.submit(self._create_completion, messages=messages, **self._completion_params(sample=i))
+                for i in range(self.samples)
+            ]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return self._sample_texts(results)
+
+    async def _sample_completions_async(self, messages: list) -> List[str]:
+        """Async version of _sample_completions"""
+        results = await asyncio.gather(
+            *(self._create_completion_async(messages=messages, **self._completion_params(sample=i))
+              for i in range(self.samples)),
+            return_exceptions=True
+        )
+        return self._sample_texts(results)
+
+    def _sample_texts(self, results: list) -> List[str]:
+        """Texts of the successful samples; raises the last error if every sample failed"""
+        texts = []
+        error = None
+        for result in results:
+            if isinstance(result, BaseException):
+                metrics.increment("llm_sample_errors")
+                error = result
+                continue
+            _record_usage(result.usage, "large", self.model)
+            texts.append(result.choices[0].message.content)
+        if not texts:
+            raise error
+        return texts
+
+    def _finish_samples(self, texts: List[str], cache_key: str, rule_based_score: int = None,
+                        rule_based_breakdown: Dict = None, messages: list = None) -> Dict:
+        """Aggregate self-consistency samples, or repair the first one if none is complete"""
+        analysis = _aggregate_samples(texts)
+        if analysis is not None:
+            return self._complete_analysis(analysis, [], "", cache_key, rule_based_score, rule_based_breakdown)
+        return self._finish_analysis(texts[0], cache_key, rule_based_score, rule_based_breakdown, messages)
+
+    def _build_messages(self, resume_data: Dict[str, str], rule_based_score: int = None, rule_based_breakdown: Dict = None) -> list:
+        """Build the chat messages for the analysis request, fitted under max_input_tokens"""
+        # Prepare prompt for AI with rule-based score context
+        rule_score_context = ""
+        if rule_based_score is not None and rule_based_breakdown is not None:
+            breakdown = ", ".join(
+                f"{name} {rule_based_breakdown.get(name, 0)}/{points}" for name, points in SCORE_WEIGHTS.items()
+            )
+            rule_score_context = (
+                f"\nRule-based reference score (simple automated check; evaluate independently): "
+                f"{rule_based_score}/100 ({breakdown})\n"
+            )
+
+        # Section text gets whatever the fixed parts of the prompt leave of the input budget
+        fixed_tokens = (estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(PROMPT_TEMPLATE)
+                        + estimate_tokens(rule_score_context)
+                        + sum(estimate_tokens(f"## {title}\nNot found\n") for title in SECTION_TITLES.values()))
+        sections = fit_sections(resume_data, max(0, self.max_input_tokens - fixed_tokens))
+        resume_text = "\n".join(
+            f"## {SECTION_TITLES[name]}\n{sections[name] or 'Not found'}" for name in SECTION_TITLES
+        )
+
+        # Prepare prompt for AI
+        prompt = PROMPT_TEMPLATE.format(
+            resume_text=resume_text,
+            rule_score_context=rule_score_context,
+            max_items=MAX_LIST_ITEMS
+        )
+
+        return [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+
+    def _finish_analysis(self, response_text: str, cache_key: str, rule_based_score: int = None,
+                         rule_based_breakdown: Dict = None, messages: list = None) -> Dict:
+        """Parse the model response, re-ask for missing fields, fill fallbacks and cache complete analyses"""
+        analysis, missing = _parse_analysis(response_text)
+        if analysis is not None and missing and messages is not None:
+            try:
+                chat_completion = self._create_completion(**self._reask_params(messages, response_text, missing))
+                _record_usage(chat_completion.usage, "large", self.model)
+                analysis, missing = _merge_reask(analysis, chat_completion.choices[0].message.content)
+            except Exception:
+                metrics.increment("json_reask_failures")
+        return self._complete_analysis(analysis, missing, response_text, cache_key, rule_based_score, rule_based_breakdown)
+
+    async def _finish_analysis_async(self, response_text: str, cache_key: str, rule_based_score: int = None,
+                                     rule_based_breakdown: Dict = None, messages: list = None) -> Dict:
+        """Async version of _finish_analysis"""
+        analysis, missing = _parse_analysis(response_text)
+        if analysis is not None and missing and messages is not None:
+            try:
+                chat_completion = await self._create_completion_async(
+                    **self._reask_params(messages, response_text, missing)
+                )
+                _record_usage(chat_completion.usage, "large", self.model)
+                analysis, missing = _merge_reask(analysis, chat_completion.choices[0].message.content)
+            except Exception:
+                metrics.increment("json_reask_failures")
+        return self._complete_analysis(analysis, missing, response_text, cache_key, rule_based_score, rule_based_breakdown)
+
+    def _reask_params(self, messages: list, response_text: str, missing: list) -> Dict:
+        """A short follow-up request for only the fields the first response lacked"""
+        metrics.increment("json_reasks")
+        params = self._completion_params()
+        params["max_tokens"] = 40 + sum(REASK_FIELD_TOKENS.get(field, 100) for field in missing)
+        params["messages"] = messages + [
+            {"role": "assistant", "content": response_text},
+            {
+                "role": "user",
+                "content": f"Your JSON was incomplete. Reply with ONLY a JSON object containing these fields, "
+                           f"in the same format as requested: {', '.join(missing)}"
             }
+        ]
+        return params
+
+    def _complete_analysis(self, analysis: Dict, missing: list, response_text: str, cache_key: str,
+                           rule_based_score: int = None, rule_based_breakdown: Dict = None) -> Dict:
+        """Apply fallbacks for anything still missing and cache fully valid analyses"""
+        fallback_score = rule_based_score if rule_based_score is not None else 50
+        fallback_breakdown = rule_based_breakdown if rule_based_breakdown else _empty_breakdown()
+
+        if analysis is None:
+            metrics.increment("json_parse_fallbacks")
+            # If JSON parsing fails, create structured response with fallback score
             return {
                 "ats_score": fallback_score,
                 "score_breakdown": fallback_breakdown,
-                "strengths": [],
-                "weaknesses": [],
+                "strengths": ["Resume uploaded successfully"],
+                "weaknesses": ["Unable to parse detailed analysis"],
                 "missing_sections": [],
-                "recommendations": [f"Error during analysis: {str(e)}"],
+                "recommendations": ["Please ensure resume has clear sections"],
                 "keywords_found": [],
                 "keywords_missing": [],
-                "overall_impression": f"Analysis failed: {str(e)}"
+                "overall_impression": (response_text or "")[:500]
             }
 
+        # Ensure ats_score and score_breakdown exist, use rule-based as fallback
+        if "ats_score" in missing or "score_breakdown" in missing:
+            analysis["ats_score"] = fallback_score
+            analysis["score_breakdown"] = fallback_breakdown
+        for field in missing:
+            if field in LIST_FIELDS:
+                analysis[field] = []
+            elif field == "overall_impression":
+                analysis[field] = ""
+
+        # Only cache complete analyses, never fallbacks
+        if not missing and self.cache is not None:
+            self.cache.set(cache_key, analysis)
+
+        return analysis
+
+    def _create_completion(self, **kwargs):
+        """Call the chat completions endpoint through the throttle, backing off on rate limits and transient errors"""
+        estimated = _estimate_request_tokens(kwargs)
+        for attempt in range(self.max_retries + 1):
+            started = self.throttle.acquire(estimated)
+            try:
+                metrics.increment("llm_requests")
+                response = self.client.chat.completions.create(**kwargs)
+            except _retryable_errors() as e:
+                self._release_failed(started, estimated, e)
+                if attempt >= self.max_retries:
+                    raise
+                metrics.increment("llm_retries")
+                time.sleep(_retry_delay(e, attempt))
+                continue
+            except BaseException:
+                self.throttle.release(started, estimated, ok=False)
+                raise
+            if kwargs.get("stream"):
+                return self._throttled_stream(response, started, estimated)
+            self.throttle.release(started, estimated, _usage_tokens(response.usage))
+            return response
+
+    async def _create_completion_async(self, **kwargs):
+        """Async version of _create_completion with the same throttle and retry-with-jitter policy"""
+        estimated = _estimate_request_tokens(kwargs)
+        for attempt in range(self.max_retries + 1):
+            started = await self.throttle.acquire_async(estimated)
+            try:
+                metrics.increment("llm_requests")
+                response = await self.async_client.chat.completions.create(**kwargs)
+            except _retryable_errors() as e:
+                self._release_failed(started, estimated, e)
+                if attempt >= self.max_retries:
+                    raise
+                metrics.increment("llm_retries")
+                await asyncio.sleep(_retry_delay(e, attempt))
+                continue
+            except BaseException:
+                self.throttle.release(started, estimated, ok=False)
+                raise
+            self.throttle.release(started, estimated, _usage_tokens(response.usage))
+            return response
+
+    def _release_failed(self, started: float, estimated: int, error: Exception) -> None:
+        from groq import RateLimitError
+        rate_limited = isinstance(error, RateLimitError)
+        if rate_limited:
+            metrics.increment("llm_rate_limited")
+        self.throttle.release(started, estimated, ok=False, rate_limited=rate_limited,
+                              retry_after=_retry_after(error))
+
+    def _throttled_stream(self, stream, started: float, estimated: int):
+        """Hold the throttle slot until the stream is consumed, then settle its real token usage"""
+        used = None
+        ok = False
+        try:
+            for chunk in stream:
+                x_groq = getattr(chunk, "x_groq", None)
+                if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                    used = _usage_tokens(x_groq.usage)
+                yield chunk
+            ok = True
+        finally:
+            self.throttle.release(started, estimated, used, ok=ok)
+
+    def _require_api_key(self) -> str:
+        if not self.api_key:
+            raise ValueError(
+                "GROQ_API_KEY not found. Please create a .env file in the analyzer directory "
+                "with your GROQ_API_KEY. Example: GROQ_API_KEY=your_key_here"
+            )
+        return self.api_key
+
+    @property
+    def client(self):
+        """Groq client created on first use; raises ValueError if GROQ_API_KEY is not set"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from groq import Groq
+                    # Retries are handled in _create_completion so backoff follows a single policy
+                    self._client = Groq(api_key=self._require_api_key(), max_retries=0,
+                                        timeout=self.request_timeout)
+        return self._client
+
+    @property
+    def async_client(self):
+        """AsyncGroq client created on first use and shared by every async call"""
+        if self._async_client is None:
+            import httpx
+            from groq import AsyncGroq, DefaultAsyncHttpxClient
+            api_key = self._require_api_key()
+            http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+            self._async_client = AsyncGroq(api_key=api_key, max_retries=0, timeout=self.request_timeout,
+                                           http_client=http_client)
+        return self._async_client
+
+    def close(self) -> None:
+        """Stop the sampling thread pool; in-flight samples still finish"""
+        with self._sampler_lock:
+            if self._sampler is not None:
+                self._sampler.shutdown(wait=False)
+                self._sampler = None
+
+    async def aclose(self) -> None:
+        """Close the pooled async HTTP client"""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    @metrics.timed("get_improvement_suggestions")
     def get_improvement_suggestions(self, resume_data: Dict[str, str], ats_score: int) -> list:
         """Generate specific improvement suggestions"""
         suggestions = []
@@ -264,3 +947,146 @@ Be specific and actionable in your recommendations. The ats_score must be an int
             suggestions.append("Include action verbs and quantifiable results")
 
         return suggestions
+
+
+class _PartialAnalysis(dict):
+    """Fields streamed so far, as opposed to a final analysis"""
+
+
+def _empty_breakdown() -> Dict:
+    return {
+        "contact_info": 0,
+        "summary": 0,
+        "experience": 0,
+        "education": 0,
+        "skills": 0,
+        "formatting": 0
+    }
+
+
+def _error_analysis(error: Exception, rule_based_score: int = None, rule_based_breakdown: Dict = None) -> Dict:
+    """Fallback analysis returned when the Groq call fails, using the rule-based score if available"""
+    fallback_score = rule_based_score if rule_based_score is not None else 50
+    fallback_breakdown = rule_based_breakdown if rule_based_breakdown else _empty_breakdown()
+    return {
+        "ats_score": fallback_score,
+        "score_breakdown": fallback_breakdown,
+        "strengths": [],
+        "weaknesses": [],
+        "missing_sections": [],
+        "recommendations": [f"Error during analysis: {str(error)}"],
+        "keywords_found": [],
+        "keywords_missing": [],
+        "overall_impression": f"Analysis failed: {str(error)}"
+    }
+
+
+def _parse_analysis(response_text: str):
+    """Extract, repair and validate the analysis; return (analysis or None, missing fields)"""
+    obj, repaired = extract_json_object(response_text or "")
+    if obj is None:
+        return None, list(ANALYSIS_SCHEMA)
+    if repaired:
+        metrics.increment("json_repairs")
+    clean, missing = coerce_to_schema(obj, ANALYSIS_SCHEMA)
+    # Keep any extra fields the model added alongside the validated ones
+    analysis = {key: value for key, value in obj.items() if key not in ANALYSIS_SCHEMA}
+    analysis.update(clean)
+    return analysis, missing
+
+
+def _merge_reask(analysis: Dict, reask_text: str):
+    """Merge the re-asked fields into analysis and return (analysis, still missing fields)"""
+    obj, _ = extract_json_object(reask_text or "")
+    if obj:
+        analysis = {**obj, **analysis}
+    clean, missing = coerce_to_schema(analysis, ANALYSIS_SCHEMA)
+    analysis.update(clean)
+    return analysis, missing
+
+
+def _aggregate_samples(texts: List[str]):
+    """Median analysis of the complete samples, with their score variance; None if no sample is complete.
+
+    ats_score and every score_breakdown category are medians across samples; the
+    lists and impression come from the sample whose score is closest to the median.
+    """
+    analyses = []
+    for text in texts:
+        analysis, missing = _parse_analysis(text)
+        if analysis is not None and not missing:
+            analyses.append(analysis)
+    if not analyses:
+        return None
+    metrics.increment("llm_samples_aggregated", len(analyses))
+
+    scores = [analysis["ats_score"] for analysis in analyses]
+    ats_score = round(statistics.median(scores))
+    breakdown = {
+        name: round(statistics.median(analysis["score_breakdown"][name] for analysis in analyses))
+        for name in SCORE_WEIGHTS
+    }
+    representative = min(analyses, key=lambda analysis: abs(analysis["ats_score"] - ats_score))
+    aggregated = dict(representative, ats_score=ats_score, score_breakdown=breakdown)
+    aggregated["score_variance"] = {
+        "samples": len(analyses),
+        "ats_score": round(statistics.pvariance(scores), 2),
+        "score_breakdown": {
+            name: round(statistics.pvariance([analysis["score_breakdown"][name] for analysis in analyses]), 2)
+            for name in SCORE_WEIGHTS
+        }
+    }
+    return aggregated
+
+
+def _record_usage(usage, route: str = None, model: str = None) -> None:
+    """Add the token counts reported by Groq, and the route's token count and cost, to the metrics"""
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    metrics.increment("llm_prompt_tokens", prompt_tokens)
+    metrics.increment("llm_completion_tokens", completion_tokens)
+    if route is None:
+        return
+    metrics.increment(f"llm_route_{route}_requests")
+    metrics.increment(f"llm_route_{route}_tokens", prompt_tokens + completion_tokens)
+    prices = MODEL_PRICES.get(model)
+    if prices is not None:
+        cost = (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+        metrics.increment(f"llm_route_{route}_cost_usd", cost)
+        metrics.increment("llm_cost_usd", cost)
+
+
+def _usage_tokens(usage):
+    """Total tokens Groq charged for a request, or None if it did not say"""
+    if usage is None:
+        return None
+    return (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+
+
+def _estimate_request_tokens(params: Dict) -> int:
+    """Tokens a request may count against the TPM limit: the prompt plus the completion budget"""
+    prompt = sum(estimate_tokens(message.get("content") or "") for message in params.get("messages", []))
+    return prompt + params.get("max_tokens", OUTPUT_MAX_TOKENS)
+
+
+def _retry_after(error: Exception):
+    """Seconds from the Retry-After header of a Groq error response, or None"""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return None
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying, honouring Retry-After when Groq sends it"""
+    retry_after = _retry_after(error)
+    if retry_after is not None:
+        return retry_after
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(30.0, 2 ** attempt))
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from metrics import metrics
+from pdf_parser import PARSER_VERSION, extract_resume_data
+from storage import cache_path, connect
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_STORE_PATH = cache_path('resumes.sqlite3')
+
+# zstd (zstandard is in requirements.txt), zlib if it is missing; rows record which one they use
+CODEC = "zstd" if zstandard is not None else "zlib"
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def _compress(data: Dict) -> bytes:
+    raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    if CODEC == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(raw)
+    return zlib.compress(raw, 9)
+
+
+def _decompress(blob: bytes, codec: str) -> Dict:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("this resume was stored with zstd; install the zstandard package to read it")
+        raw = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        raw = zlib.decompress(blob)
+    return json.loads(raw.decode("utf-8"))
+
+
+def file_sha256(pdf_file) -> str:
+    """Content hash of a PDF given as a path, bytes or file-like object, read in chunks"""
+    digest = hashlib.sha256()
+    if isinstance(pdf_file, (bytes, bytearray)):
+        digest.update(pdf_file)
+        return digest.hexdigest()
+    if isinstance(pdf_file, (str, os.PathLike)):
+        with open(pdf_file, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    pdf_file.seek(0)
+    for chunk in iter(lambda: pdf_file.read(HASH_CHUNK_BYTES), b""):
+        digest.update(chunk)
+    pdf_file.seek(0)
+    return digest.hexdigest()
+
+
+class ResumeStore:
+    """SQLite store of extract_resume_data output keyed by PDF hash.
+
+    Rows parsed by an older PARSER_VERSION are treated as missing, so parser
+    changes re-parse lazily while scoring or prompt changes can be re-run over
+    every stored resume without opening a single PDF.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS resumes (
+                file_hash TEXT PRIMARY KEY,
+                parser_version TEXT NOT NULL,
+                source TEXT,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL,
+                parsed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, file_hash: str) -> Optional[Dict]:
+        """Return the parsed resume for file_hash, or None if absent or parsed by another parser version"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT codec, data FROM resumes WHERE file_hash = ? AND parser_version = ?",
+                (file_hash, PARSER_VERSION)
+            ).fetchone()
+        if row is None:
+            return None
+        return _decompress(row[1], row[0])
+
+    def put(self, file_hash: str, resume_data: Dict, source: str = None) -> None:
+        """Store parsed resume data, replacing any earlier version"""
+        blob = _compress(resume_data)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resumes (file_hash, parser_version, source, codec, data, parsed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (file_hash, PARSER_VERSION, source, CODEC, blob, time.time())
+            )
+            self._conn.commit()
+
+    def iter_resumes(self, batch_size: int = 500) -> Iterator[Tuple[str, str, Dict]]:
+        """Yield (file_hash, source, resume_data) for every resume parsed by the current parser version"""
+        last = ""
+        while True:
+            # Keyset pagination keeps memory flat and never holds the lock across yields
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT file_hash, source, codec, data FROM resumes "
+                    "WHERE parser_version = ? AND file_hash > ? ORDER BY file_hash LIMIT ?",
+                    (PARSER_VERSION, last, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for file_hash, source, codec, blob in rows:
+                yield file_hash, source, _decompress(blob, codec)
+            last = rows[-1][0]
+
+    def stats(self) -> Dict:
+        """Number of stored resumes, how many are stale, and the compressed size"""
+        with self._lock:
+            total, current, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(parser_version = ?), 0), COALESCE(SUM(LENGTH(data)), 0) FROM resumes",
+                (PARSER_VERSION,)
+            ).fetchone()
+        return {"entries": total, "stale": total - current, "compressed_bytes": size, "codec": CODEC}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def load_resume_data(pdf_file, store: ResumeStore, source: str = None,
+                     extract: Callable[..., Dict] = extract_resume_data) -> Tuple[str, Dict]:
+    """Return (file_hash, resume_data), parsing the PDF with extract only if the store lacks a current entry"""
+    file_hash = file_sha256(pdf_file)
+    resume_data = store.get(file_hash)
+    if resume_data is not None:
+        metrics.increment("resume_store_hits")
+        return file_hash, resume_data
+    metrics.increment("resume_store_misses")
+    resume_data = extract(pdf_file)
+    if source is None and isinstance(pdf_file, (str, os.PathLike)):
+        source = os.fspath(pdf_file)
+    store.put(file_hash, resume_data, source or getattr(pdf_file, "name", None))
+    return file_hash, resume_data
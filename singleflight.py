@@ -0,0 +1,175 @@
+import asyncio
+import copy
+import hashlib
+import os
+import threading
+from typing import Callable, Dict
+
+from metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Lock files shared by all keys in a process-wide deployment; collisions only serialize unrelated keys
+LOCK_STRIPES = 256
+
+
+class LeaderAbandoned(Exception):
+    """The leader stopped without a result (e.g. an abandoned stream); waiters should retry"""
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "lock_file")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.lock_file = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key so only one of them does the work.
+
+    The first caller for a key (the leader) runs it; callers that arrive while it
+    is in flight block and receive a copy of the leader's result or its exception.
+    """
+
+    cross_process = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def acquire(self, key: str):
+        """Return (call, leader); only the leader should do the work and then release() or abandon()"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                metrics.increment("singleflight_coalesced")
+                return call, False
+            call = self._calls[key] = _Call()
+        return call, True
+
+    def wait(self, call: _Call):
+        """Block until the leader releases call and return a private copy of its result"""
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return copy.deepcopy(call.result)
+
+    def lead_or_wait(self, key: str):
+        """Return (call, None) if the caller became the leader, else (None, the leader's result)"""
+        while True:
+            call, leader = self.acquire(key)
+            if leader:
+                return call, None
+            try:
+                return None, self.wait(call)
+            except LeaderAbandoned:
+                # Take over: the next acquire() makes one of the waiters the new leader
+                continue
+
+    def release(self, key: str, call: _Call, result=None, error: BaseException = None) -> None:
+        """Publish the leader's outcome to every waiting caller"""
+        call.result = result
+        call.error = error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.event.set()
+
+    def abandon(self, key: str, call: _Call) -> None:
+        """Give up leadership without a result so a waiter runs the work instead"""
+        self.release(key, call, error=LeaderAbandoned(key))
+
+    def do(self, key: str, fn: Callable):
+        """Run fn once for all concurrent callers with the same key"""
+        call, result = self.lead_or_wait(key)
+        if call is None:
+            return result
+        try:
+            result = fn()
+        except Exception as e:
+            self.release(key, call, error=e)
+            raise
+        except BaseException:
+            self.abandon(key, call)
+            raise
+        self.release(key, call, result)
+        return result
+
+
+class ProcessSingleFlight(SingleFlight):
+    """SingleFlight that also serializes leaders across processes with striped file locks.
+
+    Leaders in other processes wait on the lock and should re-check the shared
+    cache once they hold it, so only one process pays for the LLM call.
+    """
+
+    cross_process = True
+
+    def __init__(self, lock_dir: str):
+        if fcntl is None:
+            raise RuntimeError("ProcessSingleFlight needs fcntl file locks, which this platform lacks")
+        super().__init__()
+        os.makedirs(lock_dir, exist_ok=True)
+        self.lock_dir = lock_dir
+
+    def acquire(self, key: str):
+        call, leader = super().acquire(key)
+        if leader:
+            stripe = int(hashlib.sha1(key.encode("utf-8")).hexdigest(), 16) % LOCK_STRIPES
+            lock_file = open(os.path.join(self.lock_dir, f"{stripe:03d}.lock"), "a+")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            except BaseException:
+                lock_file.close()
+                self.abandon(key, call)
+                raise
+            call.lock_file = lock_file
+        return call, leader
+
+    def release(self, key: str, call: _Call, result=None, error: BaseException = None) -> None:
+        if call.lock_file is not None:
+            fcntl.flock(call.lock_file, fcntl.LOCK_UN)
+            call.lock_file.close()
+            call.lock_file = None
+        super().release(key, call, result, error)
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of SingleFlight.
+
+    The work runs in a shared task; each caller awaits it through asyncio.shield,
+    so one caller timing out or being cancelled does not cancel the others. The
+    task is cancelled only when every caller has gone away.
+    """
+
+    def __init__(self):
+        self._tasks: Dict = {}
+
+    async def do(self, key: str, coroutine_factory: Callable):
+        loop_key = (id(asyncio.get_running_loop()), key)
+        entry = self._tasks.get(loop_key)
+        if entry is None:
+            task = asyncio.ensure_future(coroutine_factory())
+            entry = self._tasks[loop_key] = {"task": task, "waiters": 0}
+            task.add_done_callback(lambda _: self._tasks.pop(loop_key, None))
+            leader = True
+        else:
+            metrics.increment("singleflight_coalesced")
+            leader = False
+
+        entry["waiters"] += 1
+        try:
+            result = await asyncio.shield(entry["task"])
+        except asyncio.CancelledError:
+            entry["waiters"] -= 1
+            if entry["waiters"] == 0:
+                entry["task"].cancel()
+            raise
+        entry["waiters"] -= 1
+        return result if leader else copy.deepcopy(result)
@@ -0,0 +1,24 @@
+import os
+import sqlite3
+
+# Default directory of the analysis cache, resume store, near-duplicate index and job queue, next to this script
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+
+def cache_path(name: str) -> str:
+    """Default location of the database called name"""
+    return os.path.join(CACHE_DIR, name)
+
+
+def connect(path: str, **kwargs) -> sqlite3.Connection:
+    """Open the SQLite database at path in WAL mode, creating its directory first.
+
+    The connection may be used from any thread (Streamlit reruns the script on
+    different threads), so callers share it under their own lock. kwargs are
+    passed to sqlite3.connect, e.g. isolation_level and timeout.
+    """
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, **kwargs)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
@@ -0,0 +1,244 @@
+"""Local stand-in for the Groq chat.completions endpoint.
+
+Point the analyzer at it with GROQ_BASE_URL, e.g.:
+    python stub_groq.py --port 8765 --latency 0.5 --failure-rate 0.1
+    python stub_groq.py --rpm 30 --tpm 6000    # enforce Groq-style rate limits
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=stub streamlit run app.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+SAMPLE_ANALYSIS = {
+    "ats_score": 62,
+    "score_breakdown": {
+        "contact_info": 10,
+        "summary": 8,
+        "experience": 20,
+        "education": 15,
+        "skills": 7,
+        "formatting": 2
+    },
+    "strengths": ["Relevant work experience", "Clear education section"],
+    "weaknesses": ["Few quantified achievements", "Generic summary"],
+    "missing_sections": ["Certifications"],
+    "recommendations": ["Quantify impact in each role", "Tailor the summary to the target job"],
+    "keywords_found": ["Python", "SQL"],
+    "keywords_missing": ["Docker", "CI/CD"],
+    "overall_impression": "Solid foundation but lacks measurable impact."
+}
+
+
+class StubConfig:
+    """Behaviour knobs for the stub server; may be changed while it is running"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0,
+                 retry_after: float = 1.0, response_text: str = None, chunk_delay: float = 0.0,
+                 rpm: int = 0, tpm: int = 0):
+        self.latency = latency
+        # Delay between streamed chunks, to mimic token generation speed
+        self.chunk_delay = chunk_delay
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.retry_after = retry_after
+        self.response_text = response_text if response_text is not None else json.dumps(SAMPLE_ANALYSIS, indent=2)
+        # Requests and tokens per minute, replenished continuously like Groq's limits; 0 disables the limit
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = 0
+        self.failures = 0
+        self.rate_limited = 0
+        self.request_budget = float(rpm)
+        self.token_budget = float(tpm)
+        self.budget_updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def admit(self, tokens: int):
+        """Charge a request against the rate limits; return None if allowed, else seconds until it would be.
+
+        Must be called with lock held.
+        """
+        now = time.monotonic()
+        elapsed = now - self.budget_updated
+        self.budget_updated = now
+        self.request_budget = min(self.rpm, self.request_budget + elapsed * self.rpm / 60)
+        self.token_budget = min(self.tpm, self.token_budget + elapsed * self.tpm / 60)
+        waits = []
+        if self.rpm and self.request_budget < 1:
+            waits.append((1 - self.request_budget) * 60 / self.rpm)
+        if self.tpm and self.token_budget < min(tokens, self.tpm):
+            waits.append((min(tokens, self.tpm) - self.token_budget) * 60 / self.tpm)
+        if waits:
+            return max(waits)
+        self.request_budget -= 1
+        self.token_budget -= tokens
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep benchmark and test output quiet
+        pass
+
+    def _send_json(self, status: int, payload: Dict, headers: Dict = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        config = self.server.config
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path != COMPLETIONS_PATH:
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+
+        with config.lock:
+            config.requests += 1
+            limited_for = config.admit(_request_tokens(request))
+            if limited_for is not None:
+                config.rate_limited += 1
+            fail = random.random() < config.failure_rate
+            if fail:
+                config.failures += 1
+
+        if limited_for is not None:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (stub)", "type": "tokens", "code": "rate_limit_exceeded"}},
+                headers={"retry-after": f"{limited_for:.2f}"}
+            )
+            return
+
+        delay = config.latency + random.uniform(0, config.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if fail:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (stub)", "type": "requests", "code": "rate_limit_exceeded"}},
+                headers={"retry-after": str(config.retry_after)}
+            )
+            return
+
+        if request.get("stream"):
+            self._send_stream(request, config)
+        else:
+            self._send_json(200, _completion_payload(request, config.response_text))
+
+    def _send_stream(self, request: Dict, config: StubConfig) -> None:
+        """Send the response as server-sent chat.completion.chunk events"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        content = config.response_text
+        pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+        for index, piece in enumerate(pieces):
+            last = index == len(pieces) - 1
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": piece},
+                    "finish_reason": "stop" if last else None
+                }]
+            }
+            if last:
+                # Groq reports token usage on the final chunk
+                event["x_groq"] = {"usage": _completion_payload(request, content)["usage"]}
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if config.chunk_delay and not last:
+                time.sleep(config.chunk_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def _request_tokens(request: Dict) -> int:
+    """Tokens a request counts against the TPM limit: prompt plus requested completion budget"""
+    prompt_chars = sum(len(m.get("content") or "") for m in request.get("messages", []))
+    return prompt_chars // 4 + int(request.get("max_tokens") or 0)
+
+
+def _completion_payload(request: Dict, content: str) -> Dict:
+    """Build an OpenAI-compatible chat.completion response"""
+    prompt_chars = sum(len(m.get("content") or "") for m in request.get("messages", []))
+    prompt_tokens = prompt_chars // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, **config_kwargs) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stub in a background thread and return (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.config = StubConfig(**config_kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run a local stub of the Groq chat.completions endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="base response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with 429 responses")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="delay between streamed chunks in seconds")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before answering 429 (0: unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="tokens per minute before answering 429 (0: unlimited)")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), _Handler)
+    server.config = StubConfig(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+                               retry_after=args.retry_after, chunk_delay=args.chunk_delay,
+                               rpm=args.rpm, tpm=args.tpm)
+    print(f"Stub Groq server listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
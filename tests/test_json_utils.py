@@ -0,0 +1,105 @@
+import json
+
+from json_utils import (IncrementalObjectParser, coerce_to_schema, extract_json_object, find_first_object,
+                        repair_truncated_json)
+
+SCHEMA = {
+    "ats_score": (int, 0, 100),
+    "score_breakdown": {"experience": (int, 0, 30), "skills": (int, 0, 15)},
+    "strengths": list,
+    "overall_impression": str
+}
+
+
+def test_find_first_object_stops_at_first_complete_object():
+    text = 'Here you go: {"a": "}", "b": [1, {"c": 2}]} and {"d": 3}'
+    start, end = find_first_object(text)
+    assert json.loads(text[start:end]) == {"a": "}", "b": [1, {"c": 2}]}
+    assert find_first_object("no json here") is None
+
+
+def test_repair_truncated_mid_string():
+    assert repair_truncated_json('{"a": 1, "b": "unfinis') == '{"a": 1}'
+
+
+def test_repair_truncated_mid_array():
+    assert json.loads(repair_truncated_json('{"a": 1, "b": ["x", "y')) == {"a": 1, "b": ["x"]}
+
+
+def test_repair_truncated_nested_object():
+    assert json.loads(repair_truncated_json('{"a": {"b": 1, "c": 2')) == {"a": {"b": 1}}
+
+
+def test_repair_without_object():
+    assert repair_truncated_json("just prose") is None
+
+
+def test_extract_plain_object_is_not_repaired():
+    assert extract_json_object('{"ats_score": 70}') == ({"ats_score": 70}, False)
+
+
+def test_extract_skips_preamble():
+    assert extract_json_object('Sure! Here is the analysis:\n{"ats_score": 70}\nThanks') == ({"ats_score": 70}, False)
+
+
+def test_extract_repairs_trailing_comma():
+    assert extract_json_object('{"a": [1, 2,], "b": 3,}') == ({"a": [1, 2], "b": 3}, True)
+
+
+def test_extract_repairs_truncation():
+    assert extract_json_object('```json\n{"ats_score": 55, "strengths": ["Clear layout", "Quant') == (
+        {"ats_score": 55, "strengths": ["Clear layout"]}, True)
+
+
+def test_extract_gives_up_on_garbage():
+    assert extract_json_object("") == (None, False)
+    assert extract_json_object("no braces at all") == (None, False)
+    assert extract_json_object('{"unterminated') == (None, False)
+
+
+def test_coerce_clamps_and_parses_scores():
+    clean, missing = coerce_to_schema({
+        "ats_score": "72/100",
+        "score_breakdown": {"experience": 45, "skills": "9"},
+        "strengths": ["Leadership", None, {"detail": "x"}],
+        "overall_impression": "  Solid.  "
+    }, SCHEMA)
+    assert missing == []
+    assert clean == {
+        "ats_score": 72,
+        "score_breakdown": {"experience": 30, "skills": 9},
+        "strengths": ["Leadership", '{"detail": "x"}'],
+        "overall_impression": "Solid."
+    }
+
+
+def test_coerce_reports_missing_and_invalid_fields():
+    clean, missing = coerce_to_schema({
+        "ats_score": True,
+        "score_breakdown": {"experience": 20},
+        "strengths": "Only one strength"
+    }, SCHEMA)
+    assert clean == {"strengths": ["Only one strength"]}
+    assert missing == ["ats_score", "score_breakdown", "overall_impression"]
+
+
+def _feed_in_chunks(text: str, size: int = 3):
+    parser = IncrementalObjectParser()
+    fields = {}
+    for i in range(0, len(text), size):
+        fields.update(parser.feed(text[i:i + size]))
+    return parser, fields
+
+
+def test_incremental_parser_streams_fields():
+    parser = IncrementalObjectParser()
+    assert parser.feed('{"ats_score": 6') == {}
+    assert parser.feed('4, "strengths": ["a"') == {"ats_score": 64}
+    assert parser.feed(', "b"]}') == {"strengths": ["a", "b"]}
+    assert parser.done
+
+
+def test_incremental_parser_ignores_brackets_in_preamble():
+    parser, fields = _feed_in_chunks('Sure [note]: {"ats_score": 50, "x": [1, {"y": "}"}]} trailing')
+    assert parser.done
+    assert fields == {"ats_score": 50, "x": [1, {"y": "}"}]}
@@ -0,0 +1,108 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from rate_limit import AdaptiveConcurrency, LLMThrottle, TokenBucket
+from stub_groq import COMPLETIONS_PATH, start_stub_server
+
+
+def test_token_bucket_allows_burst_then_spaces_requests():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    # The third request goes into debt and must wait for one token at 10 per second
+    assert bucket.reserve(1) == pytest.approx(0.1, abs=0.02)
+
+
+def test_token_bucket_refund_returns_capacity():
+    bucket = TokenBucket(rate=1, capacity=100)
+    bucket.reserve(100)
+    assert bucket.reserve(50) > 0
+    bucket.refund(150)
+    assert bucket.reserve(100) == 0
+
+
+def test_token_bucket_zero_rate_is_unlimited():
+    bucket = TokenBucket(rate=0, capacity=0)
+    assert all(bucket.reserve(1000) == 0 for _ in range(100))
+
+
+def test_aimd_halves_on_rate_limit_and_grows_on_success():
+    concurrency = AdaptiveConcurrency(initial=8, maximum=8, cooldown=0)
+    concurrency.acquire()
+    concurrency.release(rate_limited=True)
+    assert concurrency.limit == 4
+    for _ in range(4):
+        concurrency.acquire()
+        concurrency.release(latency=0.01)
+    # Additive increase of 1/limit per success: about one slot per window of successes
+    assert 4.9 < concurrency.limit < 5
+
+
+def test_aimd_counts_a_burst_of_rate_limits_once_per_cooldown():
+    concurrency = AdaptiveConcurrency(initial=16, cooldown=60)
+    for _ in range(5):
+        concurrency.acquire()
+    for _ in range(5):
+        concurrency.release(rate_limited=True)
+    assert concurrency.limit == 8
+
+
+def test_aimd_limits_in_flight_requests():
+    concurrency = AdaptiveConcurrency(initial=2)
+    assert concurrency.try_acquire()
+    assert concurrency.try_acquire()
+    assert not concurrency.try_acquire()
+    concurrency.release(latency=0.01)
+    assert concurrency.try_acquire()
+
+
+def test_throttle_holds_callers_back_after_retry_after():
+    throttle = LLMThrottle(max_concurrency=4)
+    started = throttle.acquire(100)
+    throttle.release(started, 100, ok=False, rate_limited=True, retry_after=0.2)
+    start = time.monotonic()
+    throttle.release(throttle.acquire(100), 100)
+    assert time.monotonic() - start >= 0.19
+
+
+def _send_burst(base_url: str, count: int, throttle: LLMThrottle = None) -> int:
+    """POST count completions to the stub, through throttle if given; return how many got a 429"""
+    body = json.dumps({"model": "stub", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 5}).encode()
+    rejected = 0
+    for _ in range(count):
+        started = throttle.acquire(10) if throttle is not None else None
+        request = urllib.request.Request(base_url + COMPLETIONS_PATH, data=body,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(request, timeout=5).read()
+            ok = True
+        except urllib.error.HTTPError as e:
+            assert e.code == 429
+            rejected += 1
+            ok = False
+        if throttle is not None:
+            throttle.release(started, 10, ok=ok, rate_limited=not ok)
+    return rejected
+
+
+def test_unthrottled_burst_hits_the_stub_rate_limit():
+    server, base_url = start_stub_server(rpm=60)
+    try:
+        assert _send_burst(base_url, 63) == 3
+    finally:
+        server.shutdown()
+
+
+def test_throttle_at_the_plan_rpm_avoids_429s():
+    server, base_url = start_stub_server(rpm=60)
+    try:
+        start = time.monotonic()
+        assert _send_burst(base_url, 62, LLMThrottle(requests_per_minute=60)) == 0
+        # The 60-request burst fits the bucket; the last two wait about a second each
+        assert time.monotonic() - start >= 1.5
+    finally:
+        server.shutdown()
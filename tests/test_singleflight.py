@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from singleflight import AsyncSingleFlight, LeaderAbandoned, SingleFlight
+
+
+class _Stop(BaseException):
+    """Stands in for a leader interrupted mid-call, e.g. an abandoned stream"""
+
+
+def _run_concurrently(target, count: int):
+    results = [None] * count
+    errors = [None] * count
+
+    def run(index):
+        try:
+            results[index] = target()
+        except BaseException as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+
+def test_leader_runs_once_and_waiters_get_copies():
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"ats_score": 70, "strengths": ["a"]}
+
+    results, errors = _run_concurrently(lambda: flight.do("key", work), 5)
+    assert len(calls) == 1
+    assert errors == [None] * 5
+    assert all(result == {"ats_score": 70, "strengths": ["a"]} for result in results)
+    # Waiters get private copies, so one caller mutating its result cannot affect the others
+    assert len({id(result) for result in results}) == 5
+
+
+def test_leader_error_reaches_waiters():
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        raise ValueError("groq down")
+
+    _, errors = _run_concurrently(lambda: flight.do("key", work), 4)
+    assert len(calls) == 1
+    assert all(isinstance(error, ValueError) for error in errors)
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    calls = []
+
+    def work(key):
+        calls.append(key)
+        time.sleep(0.1)
+        return key
+
+    keys = iter(["a", "b", "c"])
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            key = next(keys)
+        return flight.do(key, lambda: work(key))
+
+    results, _ = _run_concurrently(call, 3)
+    assert sorted(calls) == sorted(results) == ["a", "b", "c"]
+
+
+def test_abandoned_leader_hands_over_to_a_waiter():
+    flight = SingleFlight()
+    calls = []
+    leader_started = threading.Event()
+
+    def leader_work():
+        calls.append("leader")
+        leader_started.set()
+        time.sleep(0.2)
+        raise _Stop()
+
+    def waiter_work():
+        calls.append("waiter")
+        time.sleep(0.1)
+        return "from waiter"
+
+    leader_errors = []
+
+    def lead():
+        try:
+            flight.do("key", leader_work)
+        except _Stop as e:
+            leader_errors.append(e)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    leader_started.wait(5)
+    results, errors = _run_concurrently(lambda: flight.do("key", waiter_work), 3)
+    leader.join(5)
+
+    assert len(leader_errors) == 1
+    assert errors == [None] * 3
+    assert results == ["from waiter"] * 3
+    # The leader ran once and exactly one waiter took over
+    assert calls == ["leader", "waiter"]
+
+
+def test_abandon_raises_leader_abandoned_in_wait():
+    flight = SingleFlight()
+    call, leader = flight.acquire("key")
+    waiter_call, waiter_leader = flight.acquire("key")
+    assert leader and not waiter_leader and waiter_call is call
+    flight.abandon("key", call)
+    with pytest.raises(LeaderAbandoned):
+        flight.wait(waiter_call)
+    # The key is free again for a new leader
+    assert flight.acquire("key")[1]
+
+
+def test_async_single_flight_coalesces_and_survives_a_cancelled_caller():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"ats_score": 61}
+
+    async def main():
+        impatient = asyncio.ensure_future(flight.do("key", work))
+        others = [asyncio.ensure_future(flight.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return await asyncio.gather(*others)
+
+    assert asyncio.run(main()) == [{"ats_score": 61}] * 3
+    assert len(calls) == 1